@@ -1,3 +1,135 @@
+import csv
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from toursntrips.models import AdventureStyle, Continent, Country, TournTrips
+from .models import Traveller, TravellerCount, Visiting
+from .views import BOOKING_EXPORT_COLUMNS, VisitingExportView
+
+
+class VisitingExportTests(TestCase):
+    url = '/bookings/visiting/export/'
+
+    def setUp(self):
+        continent = Continent.objects.create(name='Asia', code='AS')
+        country = Country.objects.create(name='India', code='IND', continent=continent)
+        self.tour = TournTrips.objects.create(
+            title='Tour 0', country=country, adventure_styles=AdventureStyle.objects.create(name='Hiking'),
+            _days=5, _nights=4, rating=Decimal('4.5'), no_of_reviews=10, shadow_price=Decimal('100.00'),
+            discount_percentage=Decimal('10.00'), departure_date=date(2026, 11, 1),
+        )
+        self.bookings = [
+            self.book('Asha', datetime(2026, 1, 10, 23, 30, tzinfo=timezone.utc)),
+            self.book('=HYPERLINK("http://example.com","x")', datetime(2026, 1, 11, 0, 0, tzinfo=timezone.utc),
+                      notes='@SUM(A1)\n-1', count=True),
+            self.book('Ravi', datetime(2026, 2, 1, 12, 0, tzinfo=timezone.utc)),
+        ]
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(self.user)
+
+    def book(self, name, booked_on, notes='', count=False):
+        traveller = Traveller.objects.create(
+            name=name, phone_number='+12025550123', email='t@example.com', nationality='India',
+            check_in_date=date(2026, 11, 1), check_out_date=date(2026, 11, 5), hotel_rating=4,
+        )
+        if count:
+            TravellerCount.objects.create(traveller=traveller, adults=2, children=1)
+        booking = Visiting.objects.create(request_country='IN', traveller=traveller, tour=self.tour, notes=notes)
+        Visiting.objects.filter(pk=booking.pk).update(booked_on=booked_on)  # auto_now_add
+        return booking
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def csv_rows(self, **params):
+        _, content = self.export(**params)
+        return list(csv.reader(StringIO(content)))
+
+    def test_staff_only(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(User.objects.create_user('visitor', password='password'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_csv_columns_and_order(self):
+        response, _ = self.export()
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment; filename="bookings-', response['Content-Disposition'])
+
+        header, *rows = self.csv_rows()
+        self.assertEqual(header, list(BOOKING_EXPORT_COLUMNS))
+        self.assertEqual([row[0] for row in rows], [str(b.pk) for b in reversed(self.bookings)])  # newest first
+        row = dict(zip(header, rows[1]))
+        self.assertEqual((row['adults'], row['children'], row['infants']), ('2', '1', '0'))
+        self.assertEqual((row['tour_title'], row['tour_country'], row['tour_final_price']), ('Tour 0', 'India', '90.00'))
+        self.assertEqual(dict(zip(header, rows[0]))['adults'], '')  # no breakdown
+
+    async def test_asgi_export_is_streamed_incrementally(self):
+        pulled = []
+        stream_csv = VisitingExportView.stream_csv
+
+        def spy(view, rows):
+            for line in stream_csv(view, rows):
+                pulled.append(line)
+                yield line
+
+        await self.async_client.aforce_login(self.user)
+        with mock.patch('bookings.views.BOOKING_EXPORT_CHUNK_SIZE', 1), \
+                mock.patch.object(VisitingExportView, 'stream_csv', spy):
+            response = await self.async_client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            chunks = []
+            async for chunk in response.streaming_content:
+                chunks.append(chunk)
+                self.assertEqual(len(pulled), len(chunks))  # one line read per chunk sent, not all up front
+
+        self.assertEqual(len(chunks), 4)  # header + 3 bookings
+        rows = list(csv.reader(StringIO(b''.join(chunks).decode())))
+        self.assertEqual(rows[0], list(BOOKING_EXPORT_COLUMNS))
+
+    def test_jsonl(self):
+        response, content = self.export(output='jsonl')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([list(record) for record in records], [list(BOOKING_EXPORT_COLUMNS)] * 3)
+        self.assertEqual(records[0]['booked_on'], '2026-02-01T12:00:00Z')
+        self.assertEqual(records[1]['traveller_name'], '=HYPERLINK("http://example.com","x")')  # JSON isn't escaped
+        self.assertEqual(records[1]['phone_number'], '+12025550123')
+
+    def test_formula_cells_are_escaped(self):
+        header, *rows = self.csv_rows()
+        row = dict(zip(header, rows[1]))
+        self.assertEqual(row['traveller_name'], '\'=HYPERLINK("http://example.com","x")')
+        self.assertEqual(row['notes'], "'@SUM(A1)\n-1")
+        self.assertEqual(row['phone_number'], "'+12025550123")
+        self.assertEqual(dict(zip(header, rows[2]))['traveller_name'], 'Asha')
+
+    def test_date_window_is_inclusive(self):
+        def names(**params):
+            header, *rows = self.csv_rows(**params)
+            return [dict(zip(header, row))['traveller_name'] for row in rows]
+
+        self.assertEqual(names(to='2026-01-10'), ['Asha'])
+        self.assertEqual(len(names(**{'from': '2026-01-11', 'to': '2026-01-11'})), 1)
+        self.assertEqual(names(**{'from': '2026-01-12'}), ['Ravi'])
+        self.assertEqual(len(names(**{'from': '2026-01-10', 'to': '9999-12-31'})), 3)
+
+    def test_invalid_parameters(self):
+        for params, field in [
+            ({'from': '10/01/2026'}, 'from'),
+            ({'to': '2026-02-30'}, 'to'),
+            ({'output': 'xlsx'}, 'output'),
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json())
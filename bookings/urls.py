@@ -11,6 +11,7 @@ urlpatterns = [
 
     # Visiting/Booking URLs
     path('visiting/', views.VisitingListCreateView.as_view(), name='visiting-list-create'),
+    path('visiting/export/', views.VisitingExportView.as_view(), name='visiting-export'),
     path('visits/<int:pk>/', views.VisitingDetailView.as_view(), name='visiting-detail'),
 
     path('contact/', views.ContactMessageCreateView.as_view(), name='contact-create'),
@@ -1,11 +1,52 @@
 # views.py
+import csv
+import json
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticatedOrReadOnly  # Adjust as needed (e.g., AllowAny for public)
+from rest_framework.views import APIView
 from .models import Traveller, Visiting, ContactMessage
 from .serializers import TravellerSerializer, VisitingSerializer, ContactMessageSerializer
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 
+# Export column → Visiting lookup (traveller count columns are empty without a breakdown)
+BOOKING_EXPORT_COLUMNS = {
+    'booking_id': 'id',
+    'booked_on': 'booked_on',
+    'request_country': 'request_country',
+    'notes': 'notes',
+    'traveller_id': 'traveller_id',
+    'traveller_name': 'traveller__name',
+    'email': 'traveller__email',
+    'phone_number': 'traveller__phone_number',
+    'nationality': 'traveller__nationality',
+    'check_in_date': 'traveller__check_in_date',
+    'check_out_date': 'traveller__check_out_date',
+    'hotel_rating': 'traveller__hotel_rating',
+    'is_direct_flight': 'traveller__is_direct_flight',
+    'adults': 'traveller__count__adults',
+    'children': 'traveller__count__children',
+    'infants': 'traveller__count__infants',
+    'tour_id': 'tour_id',
+    'tour_title': 'tour__title',
+    'tour_country': 'tour__country__name',
+    'tour_departure_date': 'tour__departure_date',
+    'tour_final_price': 'tour__final_price',
+}
+BOOKING_EXPORT_CHUNK_SIZE = 2000
+
+# A cell starting with one of these is run as a formula by spreadsheets
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
 
 class TravellerListCreateView(generics.ListCreateAPIView):
     """
@@ -45,6 +86,102 @@ class VisitingDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
 
+class _Echo:
+    """File-like object whose write() hands back the line csv.writer formatted."""
+    def write(self, value):
+        return value
+
+
+def iterate_async(lines):
+    """
+    `lines` as an async iterator, BOOKING_EXPORT_CHUNK_SIZE lines per
+    sync_to_async hop. Under ASGI a sync iterator is list()ed before the
+    first byte goes out; this keeps the export streamed there too.
+    """
+    next_chunk = sync_to_async(lambda: ''.join(islice(lines, BOOKING_EXPORT_CHUNK_SIZE)))
+
+    async def chunks():
+        while chunk := await next_chunk():
+            yield chunk
+    return chunks()
+
+
+def csv_cell(value):
+    """Quote-prefix text a spreadsheet would evaluate ('=HYPERLINK(…)' → "'=HYPERLINK(…)")."""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class VisitingExportView(APIView):
+    """
+    GET (staff only): every booking joined with its traveller, traveller
+    breakdown and tour, one row each (BOOKING_EXPORT_COLUMNS).
+      ?output=csv | jsonl             (default csv – DRF reserves ?format=)
+      ?from=2026-01-01&to=2026-03-31  booked_on window, inclusive, either optional
+
+    Streamed: rows come from values().iterator() and are written as they
+    are read, so memory stays flat however many bookings there are – under
+    ASGI through an async iterator (iterate_async).
+    CSV cells that would run as spreadsheet formulas get a leading quote
+    (csv_cell) – phone numbers show as '+12025550123.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get('output', 'csv')
+        if output not in ('csv', 'jsonl'):
+            raise ValidationError({'output': 'Use "csv" or "jsonl".'})
+
+        rows = self.get_queryset().values_list(*BOOKING_EXPORT_COLUMNS.values()).iterator(
+            chunk_size=BOOKING_EXPORT_CHUNK_SIZE
+        )
+        if output == 'csv':
+            content, content_type = self.stream_csv(rows), 'text/csv'
+        else:
+            content, content_type = self.stream_jsonl(rows), 'application/x-ndjson'
+        if isinstance(request._request, ASGIRequest):
+            content = iterate_async(content)
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="bookings-{timezone.now():%Y%m%d}.{output}"'
+        return response
+
+    def get_date(self, param):
+        """?<param>= as a date; None if absent, ValidationError if malformed."""
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:  # well formed but not a date, e.g. 2026-02-30
+            parsed = None
+        if parsed is None:
+            raise ValidationError({param: 'Use YYYY-MM-DD.'})
+        return parsed
+
+    def get_queryset(self):
+        start, end = self.get_date('from'), self.get_date('to')
+
+        queryset = Visiting.objects.order_by('-booked_on', '-id')
+        # Whole days in the server time zone, as a booked_on range
+        if start:
+            queryset = queryset.filter(booked_on__gte=timezone.make_aware(datetime.combine(start, time.min)))
+        if end and end < date.max:
+            queryset = queryset.filter(booked_on__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)))
+        return queryset
+
+    def stream_csv(self, rows):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(BOOKING_EXPORT_COLUMNS)
+        for row in rows:
+            yield writer.writerow([csv_cell(value) for value in row])
+
+    def stream_jsonl(self, rows):
+        for row in rows:
+            yield json.dumps(dict(zip(BOOKING_EXPORT_COLUMNS, row)), cls=DjangoJSONEncoder) + '\n'
+
+
 
 
 
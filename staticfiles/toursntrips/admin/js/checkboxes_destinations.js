@@ -1,5 +1,6 @@
 // toursntrips/admin/js/checkboxes_destinations.js
-// Handles dynamic population of destinations checkboxes based on country selection
+// Destinations autocomplete (select2) limited to the selected country.
+// Only the chosen destinations are rendered; the rest are searched page by page.
 
 (function() {
     'use strict';
@@ -13,82 +14,58 @@
     }
 
     ready(function() {
-        console.log('Checkboxes Destinations JS: DOM ready');
+        console.log('Destinations autocomplete JS: DOM ready');
 
-        if (typeof django === 'undefined' || !django.jQuery) {
-            console.error('Checkboxes Destinations JS: django.jQuery is not available.');
+        if (typeof django === 'undefined' || !django.jQuery || !django.jQuery.fn.select2) {
+            console.error('Destinations autocomplete JS: django.jQuery / select2 is not available.');
             return;
         }
 
         var $ = django.jQuery;
 
         var countrySelect = $('#id_country');
-        var destinationsContainer = $('#id_destinations');
+        var destinationsSelect = $('#id_destinations.destinations-autocomplete');
 
         if (!countrySelect.length) {
-            console.warn('Checkboxes Destinations JS: #id_country not found');
+            console.warn('Destinations autocomplete JS: #id_country not found');
             return;
         }
 
-        if (!destinationsContainer.length) {
-            console.warn('Checkboxes Destinations JS: Destinations container not found');
+        if (!destinationsSelect.length) {
+            console.warn('Destinations autocomplete JS: destinations select not found');
             return;
         }
 
-        console.log('Checkboxes Destinations JS: Setup starting');
-
-        // Function to update destinations checkboxes
-        function updateDestinationsCheckboxes() {
-            var countryId = countrySelect.val();
-            if (!countryId) {
-                destinationsContainer.empty();
-                destinationsContainer.html('<li style="margin: 10px; padding: 5px; border: 1px solid #ccc; background: #f9f9f9;"><p>No country selected. Please select a country to see destinations.</p></li>');
-                // Clear hidden values? But form handles empty
-                $(document).trigger('destinationsChanged');
-                return;
-            }
-
-            // Get current checked values before update
-            var currentChecked = $('input[name="destinations"]:checked').map(function() {
-                return $(this).val();
-            }).get();
-
-            $.ajax({
-                url: '/admin/toursntrips/tourntrips/ajax/destinations-checkboxes/',
-                type: 'GET',
-                data: {country_id: countryId},
+        destinationsSelect.select2({
+            ajax: {
+                url: destinationsSelect.data('ajax--url'),
                 dataType: 'json',
-                success: function(data) {
-                    console.log('AJAX success: loaded destinations HTML');
-                    destinationsContainer.html(data.html);
-                    // Re-check valid previous selections
-                    $('input[name="destinations"]').each(function() {
-                        if (currentChecked.indexOf($(this).val()) !== -1) {
-                            $(this).prop('checked', true);
-                        }
-                    });
-                    // Trigger change for cities update
-                    $(document).trigger('destinationsChanged');
-                },
-                error: function(xhr, status, error) {
-                    console.error('AJAX Error:', status, error);
-                    destinationsContainer.empty();
-                    destinationsContainer.html('<li style="margin: 10px; padding: 5px; border: 1px solid #ccc; background: #f9f9f9;"><p>Error loading destinations.</p></li>');
+                delay: 250,
+                data: function(params) {
+                    return {term: params.term, page: params.page, country_id: countrySelect.val()};
                 }
-            });
+            },
+            theme: 'admin-autocomplete',
+            placeholder: 'Search destinations in the selected country',
+            width: '100%'
+        });
+
+        function toggleDisabled() {
+            destinationsSelect.prop('disabled', !countrySelect.val());
         }
 
-        // Bind to country change
-        countrySelect.on('change', updateDestinationsCheckboxes);
+        // Destinations of another country are no longer valid
+        countrySelect.on('change', function() {
+            destinationsSelect.val(null).trigger('change');
+            toggleDisabled();
+            $(document).trigger('destinationsChanged');
+        });
 
-        // Initial load if country pre-selected
-        if (countrySelect.val()) {
-            updateDestinationsCheckboxes();
-        } else {
-            // Initial empty message for add form
-            destinationsContainer.html('<li style="margin: 10px; padding: 5px; border: 1px solid #ccc; background: #f9f9f9;"><p>Select a country to see destinations.</p></li>');
-        }
+        destinationsSelect.on('change', function() {
+            $(document).trigger('destinationsChanged');
+        });
 
-        console.log('Checkboxes Destinations JS: Setup complete');
+        toggleDisabled();
+        console.log('Destinations autocomplete JS: Setup complete');
     });
-})();
\ No newline at end of file
+})();
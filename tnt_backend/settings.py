@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -139,6 +140,28 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 
+# ----------------------------------------------------------------------
+# Cache – catalog responses are versioned (toursntrips/cache.py)
+# ----------------------------------------------------------------------
+# Shared by every worker and management command, so a version bump in one
+# process invalidates the others – a per-process cache (locmem) would keep
+# serving its own copy until the timeout.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://localhost:6379/1',  # db 0 is the Celery broker
+    },
+}
+if sys.argv[1:2] == ['test']:
+    # The test runner is a single process
+    CACHES['default'] = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24  # seconds; entries are invalidated by version, not by time
+
+# In-process NumPy snapshot for the country tours list (toursntrips/snapshot.py).
+# Requires `pip install numpy`; falls back to the database when unavailable.
+CATALOG_SNAPSHOT_ENGINE = False
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -97,6 +97,30 @@ from django.http import JsonResponse
 from django.utils.safestring import mark_safe
 from django import forms
 from .models import TournTrips, Destination, Country  # Assuming imports
+from .serializers import destination_names_prefetch
+from .cache import country_scope, get_catalog_version
+from .dates import parse_int
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.admin.widgets import AutocompleteSelectMultiple
+from django.db.models import Count
+from django.urls import reverse
+
+class DestinationAutocompleteWidget(AutocompleteSelectMultiple):
+    """
+    select2 multi-select of destinations. Only the selected options are
+    rendered; the rest are searched page by page in the chosen country
+    (TournTripsAdmin.ajax_destinations_search_view, checkboxes_destinations.js).
+    """
+    def get_url(self):
+        return reverse('admin:tourn_trips_ajax_destinations_search')
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        # Not 'admin-autocomplete' – our JS initialises it with the country filter
+        attrs['class'] = attrs['class'].replace('admin-autocomplete', 'destinations-autocomplete')
+        return attrs
+
 
 class TournTripsAdminForm(forms.ModelForm):
     start_city = forms.MultipleChoiceField(
@@ -114,7 +138,7 @@ class TournTripsAdminForm(forms.ModelForm):
         model = TournTrips
         fields = '__all__'
         widgets = {
-            'destinations': forms.CheckboxSelectMultiple(attrs={'class': 'destinations-checkboxes'}),
+            'destinations': DestinationAutocompleteWidget(TournTrips._meta.get_field('destinations'), admin.site),
             # OPTIONAL: Custom widget for rating to emphasize decimal input
             'rating': forms.NumberInput(attrs={
                 'step': '0.1',  # Allows decimal increments (e.g., 4.9)
@@ -126,6 +150,8 @@ class TournTripsAdminForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # Same labels as the search results; str() would load each country
+        self.fields['destinations'].label_from_instance = lambda destination: destination.name
         if self.is_bound:
             # For validation on POST, set based on submitted data
             country_id = self.data.get('country')
@@ -181,14 +207,10 @@ class TournTripsAdminForm(forms.ModelForm):
             if destinations:
                 raise forms.ValidationError("Please select a country before choosing destinations.")
             return destinations  # Or [] if required=False
-        # Enforce: All selected must belong to country (prevents tampering)
-        invalid_dests = [d for d in destinations if d.country != country]
-        if invalid_dests:
-            valid_names = [d.name for d in Destination.objects.filter(country=country).order_by('name')[:5]]
-            error_msg = f"Destinations must be in {country.name}. Invalid: {[d.name for d in invalid_dests]}. Valid: {', '.join(valid_names)}"
-            if Destination.objects.filter(country=country).count() > 5:
-                error_msg += "..."
-            raise forms.ValidationError(error_msg)
+        # Enforce: All selected must belong to country (prevents tampering) – one query
+        ids = [d.pk for d in destinations]
+        if Destination.objects.filter(id__in=ids, country=country).count() != len(ids):
+            raise forms.ValidationError(f"Destinations must be in {country.name}.")
         return destinations
 
     def clean(self):
@@ -222,6 +244,22 @@ class TournTripsAdminForm(forms.ModelForm):
             self.save_m2m()
         return instance
 
+def country_destinations(country_id):
+    """
+    [{id, name, city}, ...] of a country for the admin pickers (searched in
+    Python – no query per keystroke), cached until
+    the country's catalog version moves (any Destination change bumps it).
+    """
+    key = f'admin:destinations:{country_id}:{get_catalog_version(country_scope(country_id))}'
+    destinations = cache.get(key)
+    if destinations is None:
+        destinations = list(
+            Destination.objects.filter(country_id=country_id).order_by('name').values('id', 'name', 'city')
+        )
+        cache.set(key, destinations, getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60 * 60 * 24))
+    return destinations
+
+
 @admin.register(TournTrips)
 class TournTripsAdmin(admin.ModelAdmin):
     form = TournTripsAdminForm
@@ -239,6 +277,9 @@ class TournTripsAdmin(admin.ModelAdmin):
 
     list_editable = ['rating', 'no_of_reviews']      # duration is now read-only
 
+    # country / adventure_styles columns without a query per row
+    list_select_related = ['country', 'adventure_styles']
+
     readonly_fields = ['duration', 'current_start_city', 'current_end_city']
 
     fieldsets = (
@@ -302,52 +343,66 @@ class TournTripsAdmin(admin.ModelAdmin):
     def get_urls(self):
         urls = super().get_urls()
         custom_urls = [
-            path('ajax/destinations-checkboxes/', self.ajax_destinations_checkboxes_view, name='tourn_trips_ajax_destinations_checkboxes'),
-            path('ajax/cities-checkboxes/', self.ajax_cities_checkboxes_view, name='tourn_trips_ajax_cities_checkboxes'),
+            path('ajax/destinations-search/', self.admin_site.admin_view(self.ajax_destinations_search_view), name='tourn_trips_ajax_destinations_search'),
+            path('ajax/cities-checkboxes/', self.admin_site.admin_view(self.ajax_cities_checkboxes_view), name='tourn_trips_ajax_cities_checkboxes'),
         ]
         return custom_urls + urls
 
-    def ajax_destinations_checkboxes_view(self, request):
-        if request.method == 'GET':
-            country_id = request.GET.get('country_id')
-            widget = forms.CheckboxSelectMultiple(attrs={'class': 'destinations-checkboxes'})
-            choices = []
-            if country_id:
-                try:
-                    country = Country.objects.get(id=country_id)
-                    destinations = Destination.objects.filter(country=country).order_by('name')
-                    choices = [(d.id, str(d)) for d in destinations]
-                except Country.DoesNotExist:
-                    choices = []
-            widget.choices = choices
-            html = widget.render('destinations', [])
-            return JsonResponse({'html': mark_safe(html)})
-        return JsonResponse({'error': 'Invalid request'}, status=400)
+    # ------------------------------------------------------------------
+    # AJAX pickers – compact JSON, the markup is built by the admin JS
+    # ------------------------------------------------------------------
+    destinations_search_page_size = 20
+
+    def ajax_destinations_search_view(self, request):
+        """select2 results: ?country_id=&term=&page= → {results: [{id, text, city}], pagination: {more}}"""
+        country_id = parse_int(request.GET.get('country_id'))
+        page = parse_int(request.GET.get('page') or '1')
+        if request.method != 'GET' or country_id is None or not page:
+            return JsonResponse({'error': 'Invalid request'}, status=400)
+
+        term = request.GET.get('term', '').strip().casefold()
+        matches = [
+            d for d in country_destinations(country_id)
+            if term in d['name'].casefold() or term in (d['city'] or '').casefold()
+        ]
+        start = (page - 1) * self.destinations_search_page_size
+        end = start + self.destinations_search_page_size
+        return JsonResponse({
+            'results': [{'id': d['id'], 'text': d['name'], 'city': d['city']} for d in matches[start:end]],
+            'pagination': {'more': end < len(matches)},
+        })
 
     def ajax_cities_checkboxes_view(self, request):
-        if request.method == 'GET':
-            dest_ids = request.GET.getlist('dest_ids')
-            field_name = request.GET.get('field_name', 'start_city')
-            widget = forms.CheckboxSelectMultiple(attrs={'class': 'cities-checkboxes'})
-            choices = []
-            if dest_ids:
-                destinations = Destination.objects.filter(id__in=dest_ids)
-                possible_cities = sorted(set(d.city for d in destinations if d.city))
-                choices = [(city, city) for city in possible_cities]
-            widget.choices = choices
-            html = widget.render(field_name, [])
-            return JsonResponse({'html': mark_safe(html)})
-        return JsonResponse({'error': 'Invalid request'}, status=400)
+        dest_ids = [parse_int(d) for d in request.GET.getlist('dest_ids')]
+        country_id = parse_int(request.GET.get('country_id'))
+        if request.method != 'GET' or None in dest_ids:
+            return JsonResponse({'error': 'Invalid request'}, status=400)
+
+        if country_id is not None:
+            # Served from the cached destination list of the country
+            selected = set(dest_ids)
+            cities = {d['city'] for d in country_destinations(country_id) if d['id'] in selected}
+        else:
+            cities = set(Destination.objects.filter(id__in=dest_ids).values_list('city', flat=True))
+        return JsonResponse({'cities': sorted(city for city in cities if city)})
+
+    def get_queryset(self, request):
+        # Destination names in one prefetch and their count as an annotation,
+        # so the changelist costs the same number of queries for any page size
+        return super().get_queryset(request).prefetch_related(
+            destination_names_prefetch()
+        ).annotate(destination_count=Count('destinations', distinct=True))
 
     def get_destinations_preview(self, obj):
-        if obj.destinations.exists():
-            names = [d.name for d in obj.destinations.all()[:3]]
-            preview = ', '.join(names)
-            if len(obj.destinations.all()) > 3:
-                preview += '...'
-            return preview
-        return 'No destinations'
+        names = [d.name for d in obj.destination_names[:3]]
+        if not names:
+            return 'No destinations'
+        preview = ', '.join(names)
+        if obj.destination_count > 3:
+            preview += '...'
+        return preview
     get_destinations_preview.short_description = 'Destinations Preview'
+    get_destinations_preview.admin_order_field = 'destination_count'
 
     class Media:
         js = (
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ToursntripsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'toursntrips'
+
+    def ready(self):
+        import toursntrips.signals  # Import signals to connect them
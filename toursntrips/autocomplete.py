@@ -0,0 +1,109 @@
+# toursntrips/autocomplete.py
+"""
+In-memory prefix index for the search box autocomplete.
+
+Country names and codes, destination names and destination cities are
+normalized (accents stripped, casefolded) and stored as a sorted list
+of keys. A lookup is a bisect to the first key with the typed prefix
+followed by a short scan – no database query per keystroke.
+
+Every word of a name is indexed too, so "stat" finds "United States".
+The index is kept per process (cache.ProcessCache) and rebuilt when the
+ANY catalog version moves.
+"""
+import unicodedata
+from bisect import bisect_left
+
+from .cache import ProcessCache
+from .models import Country, Destination
+
+# Result order by type: countries, then cities, then destinations
+TYPE_RANK = {'country': 0, 'city': 1, 'destination': 2}
+
+
+def normalize(text):
+    """'  Côte d’Ivoire ' → 'cote d’ivoire'"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.casefold().split())
+
+
+class AutocompleteIndex:
+    """One sorted key array per entry type (countries, cities, destinations)."""
+
+    def __init__(self):
+        self.entries = []
+        self.sort_labels = []
+        pairs = {entry_type: [] for entry_type in TYPE_RANK}
+
+        def add(entry, *labels):
+            index = len(self.entries)
+            self.entries.append(entry)
+            self.sort_labels.append(normalize(entry['label']))
+            keys = set()
+            for label in labels:
+                words = normalize(label).split(' ')
+                # The full label and every word-suffix of it ("states", ...)
+                keys.update(' '.join(words[i:]) for i in range(len(words)))
+            keys.discard('')
+            pairs[entry['type']].extend((key, index) for key in keys)
+
+        countries = {}
+        for country_id, name, code in Country.objects.values_list('id', 'name', 'code'):
+            countries[country_id] = name
+            add({'type': 'country', 'id': country_id, 'label': name, 'country_id': country_id, 'country': name},
+                name, code)
+
+        cities = set()
+        for destination_id, name, city, country_id in Destination.objects.values_list('id', 'name', 'city', 'country_id'):
+            country = countries.get(country_id)
+            add({'type': 'destination', 'id': destination_id, 'label': name, 'country_id': country_id, 'country': country},
+                name)
+            if city and (city, country_id) not in cities:
+                cities.add((city, country_id))
+                add({'type': 'city', 'id': None, 'label': city, 'country_id': country_id, 'country': country},
+                    city)
+
+        self.keys = {}
+        self.targets = {}
+        for entry_type, type_pairs in pairs.items():
+            type_pairs.sort()
+            self.keys[entry_type] = [key for key, _ in type_pairs]
+            self.targets[entry_type] = [index for _, index in type_pairs]
+
+    def _scan(self, entry_type, prefix, limit):
+        """Up to `limit` entries of one type, whole-label prefixes first."""
+        keys, targets = self.keys[entry_type], self.targets[entry_type]
+        matches = {}
+        position = bisect_left(keys, prefix)
+        # Bounded scan: enough candidates to rank, never the whole list
+        while position < len(keys) and keys[position].startswith(prefix) and len(matches) < limit * 3:
+            index = targets[position]
+            matches[index] = matches.get(index, False) or self.sort_labels[index].startswith(prefix)
+            position += 1
+
+        ranked = sorted(
+            matches.items(),
+            key=lambda item: (not item[1], self.sort_labels[item[0]]),
+        )
+        return [self.entries[index] for index, _ in ranked[:limit]]
+
+    def lookup(self, text, limit=10):
+        prefix = normalize(text)
+        if not prefix:
+            return []
+
+        results = []
+        for entry_type in sorted(TYPE_RANK, key=TYPE_RANK.get):
+            results.extend(self._scan(entry_type, prefix, limit - len(results)))
+            if len(results) >= limit:
+                break
+        return results
+
+
+index_cache = ProcessCache(AutocompleteIndex)
+
+
+def get_index():
+    """The current worker's index, rebuilt if the catalog changed."""
+    return index_cache.get()
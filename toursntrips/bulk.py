@@ -0,0 +1,148 @@
+# toursntrips/bulk.py
+"""
+Base class for management commands that rewrite many tours at once.
+
+Saving tours one by one costs a query, a transaction (an fsync on SQLite)
+and the full set of save signals per row. BulkTourUpdateCommand instead
+streams the tours with iterator(chunk_size=--batch-size) and writes each
+chunk in one transaction, either
+
+  * set-based – update_values() returns {field: value or expression} and
+    every chunk becomes one UPDATE … WHERE id IN (…), or
+  * row by row – change() edits each streamed tour in Python and the chunk
+    is written as one prepared UPDATE … SET <fields> WHERE id = %s run with
+    executemany(). (bulk_update() would build a CASE WHEN per field whose
+    cost grows with the square of the chunk size.)
+
+A command that provides neither fails with a CommandError before any
+tour is read.
+
+Neither path sends the save signals, so the command does their work per
+chunk: it sets updated_at (ETag / Last-Modified), refreshes the columns
+the tours' TourSearchDocuments copy (plus the full-text index when
+`reindex_search`) and bumps the affected countries' catalog versions on
+commit. Generated columns (final_price, savings, popularity) are
+recomputed by the database. Commands that change destinations must
+rebuild the documents themselves (TourSearchDocument.objects.sync_tours).
+
+Every command gets --dry-run and --batch-size, and reports progress and
+throughput per chunk.
+"""
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from . import search
+from .cache import bump_catalog_version, country_scope
+from .models import TournTrips, TourSearchDocument
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def update_rows(tours, fields):
+    """Write `fields` of every tour with one prepared UPDATE … WHERE id = %s (executemany)."""
+    connection = connections[TournTrips.objects.db]  # not the proxy – this runs per value
+    fields = [TournTrips._meta.get_field(name) for name in fields]
+    quote = connection.ops.quote_name
+    sql = (
+        f"UPDATE {quote(TournTrips._meta.db_table)} "
+        f"SET {', '.join(f'{quote(field.column)} = %s' for field in fields)} "
+        f"WHERE {quote(TournTrips._meta.pk.column)} = %s"
+    )
+    rows = [
+        [field.get_db_prep_save(getattr(tour, field.attname), connection) for field in fields] + [tour.pk]
+        for tour in tours
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+class BulkTourUpdateCommand(BaseCommand):
+    fields = ()             # written by change() – the row-by-row path
+    reindex_search = True   # False when `fields` aren't in the full-text index (search.py)
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f'Tours written per transaction (default: {DEFAULT_BATCH_SIZE})',
+        )
+
+    def get_queryset(self, options):
+        """The tours to update."""
+        return TournTrips.objects.all()
+
+    def update_values(self, options):
+        """{field: value or expression} for a set-based update, or None to use change()."""
+        return None
+
+    def change(self, tour, options):
+        """Edit `tour` (only id, country and `fields` are loaded); return False to leave it alone."""
+        return False
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        queryset = self.get_queryset(options).order_by('pk')
+        values = self.update_values(options)
+        if values is None and type(self).change is BulkTourUpdateCommand.change:
+            raise CommandError(f'{type(self).__module__} defines neither update_values() nor change()')
+        if values is None and not self.fields:
+            raise CommandError(f'{type(self).__module__} defines change() but no fields to write')
+        if values is None:
+            rows = queryset.only('id', 'country_id', *self.fields)
+        else:
+            rows = queryset.values_list('id', 'country_id', named=True)
+
+        total = queryset.count()
+        self.stdout.write(f'Updating {total} TourTrips instances in batches of {batch_size}...')
+
+        started = time.monotonic()
+        updated = seen = 0
+        # Rows are still being streamed while earlier chunks are written, which
+        # SQLite doesn't isolate – walking in pk order never revisits a row
+        for chunk in chunked(rows.iterator(chunk_size=batch_size), batch_size):
+            seen += len(chunk)
+            if values is None:
+                chunk = [tour for tour in chunk if self.change(tour, options) is not False]
+            if chunk and not options['dry_run']:
+                self.write_chunk(chunk, values)
+            updated += len(chunk)
+
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'  {seen}/{total} tours ({seen / elapsed if elapsed else 0:.0f}/s)')
+
+        elapsed = time.monotonic() - started
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Dry run: would update {updated} instances.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Successfully updated {updated} instances in {elapsed:.1f}s.'))
+
+    def write_chunk(self, chunk, values):
+        ids = [row.id for row in chunk]
+        now = timezone.now()
+        with transaction.atomic():
+            if values is None:
+                for tour in chunk:
+                    tour.updated_at = now  # auto_now only applies in save()
+                update_rows(chunk, [*self.fields, 'updated_at'])
+            else:
+                TournTrips.objects.filter(id__in=ids).update(updated_at=now, **values)
+
+            # What the save signals would have done (signals.py)
+            TourSearchDocument.objects.sync_tour_fields(ids)
+            if self.reindex_search:
+                search.index_tours(ids)
+            for country_id in {row.country_id for row in chunk}:
+                transaction.on_commit(lambda scope=country_scope(country_id): bump_catalog_version(scope))
@@ -0,0 +1,180 @@
+# toursntrips/cache.py
+"""
+Catalog versions and the response cache built on top of them.
+
+Every cached response is keyed on the catalog version(s) it depends on:
+
+    GLOBAL              → continents, countries, adventure styles
+    country_scope(id)   → tours / destinations of one country
+    ANY                 → bumped with every other scope (whole-catalog snapshots)
+
+toursntrips/signals.py bumps a version whenever staff change the data
+behind it, so a cached response is never served after its data changed –
+old entries simply stop being looked up and expire. The same versions
+(plus the time of the last bump) drive ETag / Last-Modified headers.
+
+Works with any cache backend that supports incr(), but the versions must
+be shared by every process that serves or changes the catalog (API
+workers, management commands) – settings.CACHES uses Redis for that.
+locmem is per process: a bump elsewhere would never reach it.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+GLOBAL = 'global'
+ANY = 'any'
+
+
+def country_scope(country_id):
+    return f'country:{country_id}'
+
+
+def _version_key(scope):
+    return f'catalog:version:{scope}'
+
+
+def _modified_key(scope):
+    return f'catalog:modified:{scope}'
+
+
+def _seed_version(scope):
+    # Seed with a millisecond timestamp so versions never repeat after the
+    # cache is flushed (an old response can't match a "new" version 1).
+    now = time.time()
+    if cache.add(_version_key(scope), int(now * 1000), timeout=None):
+        cache.set(_modified_key(scope), now, timeout=None)
+
+
+def get_catalog_version(scope=GLOBAL):
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        _seed_version(scope)
+        version = cache.get(key)
+    return version
+
+
+def bump_catalog_version(scope=GLOBAL):
+    if scope != ANY:
+        bump_catalog_version(ANY)
+    key = _version_key(scope)
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        # Key missing (never read, evicted or flushed)
+        _seed_version(scope)
+        version = cache.incr(key)
+    cache.set(_modified_key(scope), time.time(), timeout=None)
+    return version
+
+
+def get_catalog_modified(scope=GLOBAL):
+    """
+    When `scope` last changed, as an aware datetime. Unknown (flushed)
+    means "now", so clients revalidate rather than keep stale data.
+    """
+    get_catalog_version(scope)
+    timestamp = cache.get(_modified_key(scope))
+    if timestamp is None:
+        timestamp = time.time()
+        cache.add(_modified_key(scope), timestamp, timeout=None)
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc)
+
+
+class ProcessCache:
+    """
+    A value built from the catalog and kept in this process (an index, a
+    snapshot, a lookup map) until the version of `scope` moves; the next
+    get() then rebuilds it once, whichever thread gets there first.
+    """
+
+    def __init__(self, build, scope=ANY):
+        self.build = build
+        self.scope = scope
+        self._entry = (None, None)  # (version, value)
+        self._lock = threading.Lock()
+
+    def get(self):
+        # The version is read before building, so a change committed during
+        # the build is picked up by the next get()
+        version = get_catalog_version(self.scope)
+        cached_version, value = self._entry
+        if cached_version == version:
+            return value
+        with self._lock:
+            cached_version, value = self._entry
+            if cached_version != version:
+                value = self.build()
+                self._entry = (version, value)
+            return value
+
+    def clear(self):
+        self._entry = (None, None)
+
+
+def catalog_fingerprint(name, request, kwargs, scopes, *extra):
+    """
+    Hex digest identifying one representation of a catalog resource: the
+    view `name`, its URL kwargs, normalized query params (sorted, empty
+    values dropped), host, the versions of `scopes` and any `extra` parts.
+    """
+    params = sorted(
+        (key, value)
+        for key in request.GET
+        for value in request.GET.getlist(key)
+        if value != ''
+    )
+    versions = [get_catalog_version(scope) for scope in scopes]
+    raw = repr((
+        name,
+        request.scheme,
+        request.get_host(),
+        sorted(kwargs.items()),
+        params,
+        versions,
+        extra,
+    ))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class CatalogCacheMixin:
+    """
+    Caches successful GET responses of a catalog view.
+
+    The key is the catalog_fingerprint() of the view, its URL kwargs, the
+    request, the current version of every scope returned by
+    get_catalog_scopes() and anything else the response depends on, from
+    get_catalog_cache_extra() (e.g. a date window resolved against today).
+    """
+    catalog_cache_prefix = 'catalog:response'
+
+    def get_catalog_scopes(self):
+        return [GLOBAL]
+
+    def get_catalog_cache_extra(self):
+        return ()
+
+    def get_catalog_cache_key(self, request):
+        fingerprint = catalog_fingerprint(
+            type(self).__name__, request, self.kwargs, self.get_catalog_scopes(),
+            *self.get_catalog_cache_extra()
+        )
+        return f'{self.catalog_cache_prefix}:{fingerprint}'
+
+    def get(self, request, *args, **kwargs):
+        key = self.get_catalog_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60 * 60 * 24)
+            cache.set(key, response.data, timeout)
+        return response
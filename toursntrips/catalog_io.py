@@ -0,0 +1,400 @@
+# toursntrips/catalog_io.py
+"""
+Streaming catalog export / import (`manage.py export_catalog` /
+`manage.py import_catalog`).
+
+The catalog is written as records keyed by natural keys rather than ids,
+so it loads into any database – tours, which have none, carry their id:
+
+    continent        name, code
+    country          name, code, continent (name)
+    adventure_style  name, description
+    destination      country (code), name, city, description
+    tour             id, title, country (code), adventure_style (name), days,
+                     nights, rating, no_of_reviews, shadow_price,
+                     discount_percentage, departure_date, start_city,
+                     end_city, image, destinations ([[name, city], ...])
+
+A destination is (country, name, city) – names alone repeat within a
+country – and a tour's destinations are in the tour's country.
+
+JSONL is one stream with a "type" key per record, in the order above.
+CSV is a directory with one file per type (FILENAMES); the destinations
+column holds the JSON list.
+
+Both directions stream. The export reads with iterator(), fetching the
+destinations of each chunk of tours in one query. The import resolves
+natural keys through in-memory maps and writes each chunk in one
+transaction with bulk_create() – through rows included. Existing
+continents, countries, styles and destinations (same natural key) are
+reused. Tours are appended: their ids are those of the exporting
+database, so by default every tour record adds a new tour. With
+update_by_id (`--update-by-id`, to restore or resync a copy of the same
+database) the ids are kept: a tour whose id exists is overwritten (fields
+and destinations, one prepared UPDATE per chunk), any other is created
+with that id, and a blank id adds a new tour.
+The bulk writes skip save() and the signals, so the import fills in
+slugs and durations itself, builds the tours' search documents and
+full-text rows, and bumps the catalog versions. Image files aren't
+copied – the names are kept, and `generate_image_variants` fills in
+variants and metadata afterwards.
+"""
+import csv
+import json
+import os
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from . import search
+from .bulk import chunked, update_rows
+from .cache import GLOBAL, bump_catalog_version, country_scope
+from .models import AdventureStyle, Continent, Country, Destination, TournTrips, TourSearchDocument, unique_slug
+
+TYPES = ('continent', 'country', 'adventure_style', 'destination', 'tour')  # dependency order
+
+COLUMNS = {
+    'continent': ['name', 'code'],
+    'country': ['name', 'code', 'continent'],
+    'adventure_style': ['name', 'description'],
+    'destination': ['country', 'name', 'city', 'description'],
+    'tour': [
+        'id', 'title', 'country', 'adventure_style', 'days', 'nights', 'rating', 'no_of_reviews', 'shadow_price',
+        'discount_percentage', 'departure_date', 'start_city', 'end_city', 'image', 'destinations',
+    ],
+}
+
+FILENAMES = {
+    'continent': 'continents.csv',
+    'country': 'countries.csv',
+    'adventure_style': 'adventure_styles.csv',
+    'destination': 'destinations.csv',
+    'tour': 'tours.csv',
+}
+
+# Record column → TournTrips field, where they differ
+TOUR_FIELD_NAMES = {'days': '_days', 'nights': '_nights'}
+
+# Written when a record updates an existing tour
+TOUR_UPDATE_FIELDS = [
+    'title', 'country', 'adventure_styles', '_days', '_nights', 'duration', 'rating', 'no_of_reviews',
+    'shadow_price', 'discount_percentage', 'departure_date', 'start_city', 'end_city', 'image', 'updated_at',
+]
+
+Through = TournTrips.destinations.through
+
+
+# ------------------------------------------------------------------
+# Export
+# ------------------------------------------------------------------
+def export_records(type, chunk_size=1000):
+    """Yield the records of one type as dicts (COLUMNS order)."""
+    if type == 'continent':
+        rows = Continent.objects.order_by('name').values_list('name', 'code')
+    elif type == 'country':
+        rows = Country.objects.order_by('name').values_list('name', 'code', 'continent__name')
+    elif type == 'adventure_style':
+        rows = AdventureStyle.objects.order_by('name').values_list('name', 'description')
+    elif type == 'destination':
+        rows = Destination.objects.order_by('country__code', 'name', 'city', 'id').values_list(
+            'country__code', 'name', 'city', 'description'
+        )
+    else:
+        yield from _export_tours(chunk_size)
+        return
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield dict(zip(COLUMNS[type], row))
+
+
+def _export_tours(chunk_size):
+    tours = TournTrips.objects.order_by('id').values_list(
+        'id', 'title', 'country__code', 'adventure_styles__name', '_days', '_nights', 'rating', 'no_of_reviews',
+        'shadow_price', 'discount_percentage', 'departure_date', 'start_city', 'end_city', 'image',
+    )
+    for chunk in chunked(tours.iterator(chunk_size=chunk_size), chunk_size):
+        destinations = defaultdict(list)
+        links = Through.objects.filter(tourntrips_id__in=[row[0] for row in chunk]).order_by(
+            'destination__name', 'destination__city'
+        ).values_list('tourntrips_id', 'destination__name', 'destination__city')
+        for tour_id, name, city in links:
+            destinations[tour_id].append([name, city])
+        for row in chunk:
+            yield dict(zip(COLUMNS['tour'], [*row, destinations[row[0]]]))
+
+
+def write_jsonl(stream, chunk_size=1000):
+    """Write the whole catalog to a text stream; returns {type: count}."""
+    counts = {}
+    for type in TYPES:
+        counts[type] = 0
+        for record in export_records(type, chunk_size):
+            stream.write(json.dumps({'type': type, **record}, cls=DjangoJSONEncoder) + '\n')
+            counts[type] += 1
+    return counts
+
+
+def write_csv(directory, chunk_size=1000):
+    """Write one CSV per type into `directory`; returns {type: count}."""
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+    for type in TYPES:
+        counts[type] = 0
+        with open(os.path.join(directory, FILENAMES[type]), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS[type])
+            writer.writeheader()
+            for record in export_records(type, chunk_size):
+                if type == 'tour':
+                    record['destinations'] = json.dumps(record['destinations'])
+                writer.writerow(record)
+                counts[type] += 1
+    return counts
+
+
+# ------------------------------------------------------------------
+# Import
+# ------------------------------------------------------------------
+def read_jsonl(stream):
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            raise CommandError(f'Line {number}: invalid JSON ({exc})')
+        if record.get('type') not in TYPES:
+            raise CommandError(f'Line {number}: unknown record type {record.get("type")!r}')
+        yield record
+
+
+def read_csv(directory):
+    """Records of every CSV present in `directory`, in TYPES order."""
+    for type in TYPES:
+        path = os.path.join(directory, FILENAMES[type])
+        if not os.path.exists(path):
+            continue
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for record in reader:
+                if type == 'tour':
+                    try:
+                        record['destinations'] = json.loads(record['destinations'] or '[]')
+                    except (KeyError, ValueError) as exc:
+                        raise CommandError(f'{FILENAMES[type]} line {reader.line_num}: invalid destinations ({exc!r})')
+                yield {'type': type, **record}
+
+
+def clean(model, name, value):
+    """A record value as the model field's Python value ('' is NULL for non-text fields – CSV)."""
+    field = model._meta.get_field(name)
+    if value is None or (value == '' and not field.empty_strings_allowed):
+        return None
+    return field.to_python(value)
+
+
+class CatalogImporter:
+    """
+    Loads records (read_jsonl / read_csv) into the database. Records of a
+    type are buffered and written `batch_size` at a time; a record of
+    another type first flushes the buffers, so references resolve as long
+    as records come after what they reference. Tour ids are ignored unless
+    `update_by_id` (see the module docstring).
+    """
+
+    def __init__(self, batch_size=1000, progress=None, update_by_id=False):
+        self.batch_size = batch_size
+        self.update_by_id = update_by_id
+        self.progress = progress or (lambda message: None)
+        self.created = dict.fromkeys(TYPES, 0)
+        self.updated = dict.fromkeys(TYPES, 0)
+        self.existing = dict.fromkeys(TYPES, 0)
+        self.countries_changed = set()
+
+        # Natural key → id of everything already in the database
+        self.continents = dict(Continent.objects.values_list('name', 'id'))
+        self.countries = dict(Country.objects.values_list('code', 'id'))
+        self.styles = dict(AdventureStyle.objects.values_list('name', 'id'))
+        self.destinations = {
+            (country_id, name, city): id
+            for id, country_id, name, city in Destination.objects.values_list('id', 'country_id', 'name', 'city')
+        }
+        self.continent_slugs = set(Continent.objects.values_list('slug', flat=True))
+        self.country_slugs = set(Country.objects.values_list('slug', flat=True))
+
+        self.importers = {
+            'continent': self.import_continents,
+            'country': self.import_countries,
+            'adventure_style': self.import_adventure_styles,
+            'destination': self.import_destinations,
+            'tour': self.import_tours,
+        }
+
+    def run(self, records):
+        pending = defaultdict(list)
+        count = 0
+        try:
+            for count, record in enumerate(records, 1):
+                type = record.pop('type')
+                for other in TYPES:
+                    if other != type and pending[other]:
+                        self.flush(other, pending.pop(other))
+                pending[type].append(record)
+                if len(pending[type]) >= self.batch_size:
+                    self.flush(type, pending.pop(type))
+            for type in TYPES:
+                if pending[type]:
+                    self.flush(type, pending.pop(type))
+        finally:
+            # Chunks written before an invalid record stay committed
+            if any(self.created.values()) or any(self.updated.values()):
+                transaction.on_commit(self.bump_versions)
+        return count
+
+    def bump_versions(self):
+        bump_catalog_version(GLOBAL)
+        for country_id in self.countries_changed:
+            bump_catalog_version(country_scope(country_id))
+
+    def flush(self, type, records):
+        try:
+            with transaction.atomic():
+                self.importers[type](records)
+        except (KeyError, ValidationError, ValueError, TypeError, IntegrityError) as exc:
+            raise CommandError(f'Invalid {type} record: {exc!r}')
+        updated = f', {self.updated[type]} updated' if self.updated[type] else ''
+        self.progress(f'  {type}: {self.created[type]} created{updated}, {self.existing[type]} already present')
+
+    def lookup(self, mapping, key, what):
+        try:
+            return mapping[key]
+        except KeyError:
+            raise CommandError(f'Unknown {what} {key!r}') from None
+
+    def import_new(self, type, model, mapping, records, key, build):
+        """bulk_create the records whose natural key isn't in `mapping`, then map them."""
+        new = {}
+        for record in records:
+            record_key = key(record)
+            if record_key in mapping or record_key in new:
+                self.existing[type] += 1
+            else:
+                new[record_key] = build(record)
+        model.objects.bulk_create(new.values(), batch_size=self.batch_size)
+        mapping.update((record_key, obj.pk) for record_key, obj in new.items())
+        self.created[type] += len(new)
+        return new.values()
+
+    def import_continents(self, records):
+        def build(record):
+            continent = Continent(name=record['name'], code=clean(Continent, 'code', record['code']))
+            continent.slug = unique_slug(continent, continent.name, self.continent_slugs)
+            return continent
+        self.import_new('continent', Continent, self.continents, records, lambda r: r['name'], build)
+
+    def import_countries(self, records):
+        def build(record):
+            country = Country(
+                name=record['name'],
+                code=record['code'],
+                continent_id=self.lookup(self.continents, record['continent'], 'continent'),
+            )
+            country.slug = unique_slug(country, country.name, self.country_slugs)
+            return country
+        self.import_new('country', Country, self.countries, records, lambda r: r['code'], build)
+
+    def import_adventure_styles(self, records):
+        def build(record):
+            return AdventureStyle(name=record['name'], description=clean(AdventureStyle, 'description', record['description']))
+        self.import_new('adventure_style', AdventureStyle, self.styles, records, lambda r: r['name'], build)
+
+    def import_destinations(self, records):
+        def key(record):
+            return (self.lookup(self.countries, record['country'], 'country'), record['name'], record['city'])
+
+        def build(record):
+            return Destination(
+                country_id=key(record)[0],
+                name=record['name'],
+                city=record['city'],
+                description=clean(Destination, 'description', record['description']),
+            )
+        created = self.import_new('destination', Destination, self.destinations, records, key, build)
+        self.countries_changed.update(destination.country_id for destination in created)
+
+    def import_tours(self, records):
+        # Upsert by id (update_by_id) – the last record wins when an id repeats
+        by_id, tours, links = {}, [], []
+        for record in records:
+            tour = TournTrips(
+                # Without update_by_id, or blank (or no column): a new tour
+                id=clean(TournTrips, 'id', record.get('id')) if self.update_by_id else None,
+                country_id=self.lookup(self.countries, record['country'], 'country'),
+                adventure_styles_id=self.lookup(self.styles, record['adventure_style'], 'adventure style'),
+                **{
+                    TOUR_FIELD_NAMES.get(column, column): clean(TournTrips, TOUR_FIELD_NAMES.get(column, column), record[column])
+                    for column in COLUMNS['tour'] if column not in ('id', 'country', 'adventure_style', 'destinations')
+                },
+            )
+            tour.set_duration()
+            destination_ids = [
+                self.lookup(self.destinations, (tour.country_id, name, city), 'destination')
+                for name, city in record['destinations']
+            ]
+            if tour.pk is None:
+                tours.append(tour)
+                links.append(destination_ids)
+            else:
+                by_id[tour.pk] = (tour, destination_ids)
+
+        existing = {
+            tour_id: (country_id, image or '')
+            for tour_id, country_id, image in TournTrips.objects.filter(id__in=by_id).values_list('id', 'country_id', 'image')
+        }
+        updates, update_links = [], []
+        for tour, destination_ids in by_id.values():
+            if tour.pk in existing:
+                updates.append(tour)
+                update_links.append(destination_ids)
+            else:
+                tours.append(tour)
+                links.append(destination_ids)
+
+        TournTrips.objects.bulk_create(tours, batch_size=self.batch_size)
+        if any(tour.pk in by_id for tour in tours):
+            # Explicit ids don't advance the id sequence outside SQLite
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [TournTrips]):
+                    cursor.execute(sql)
+
+        if updates:
+            now = timezone.now()
+            for tour in updates:
+                tour.updated_at = now  # auto_now only applies in save()
+            update_rows(updates, TOUR_UPDATE_FIELDS)
+            # A new image invalidates the stored metadata (as in signals.py)
+            TournTrips.objects.filter(
+                id__in=[tour.pk for tour in updates if (tour.image.name or '') != existing[tour.pk][1]]
+            ).update(image_width=None, image_height=None, image_bytes=None, image_color='', image_placeholder='')
+            Through.objects.filter(tourntrips_id__in=[tour.pk for tour in updates]).delete()
+            self.countries_changed.update(country_id for country_id, _ in existing.values())
+
+        Through.objects.bulk_create(
+            [
+                Through(tourntrips_id=tour.pk, destination_id=destination_id)
+                for tour, destination_ids in zip([*tours, *updates], [*links, *update_links])
+                for destination_id in dict.fromkeys(destination_ids)
+            ],
+            batch_size=self.batch_size,
+        )
+
+        # What the save / m2m_changed signals would have done (signals.py)
+        ids = [tour.pk for tour in [*tours, *updates]]
+        TourSearchDocument.objects.sync_tours(ids)
+        search.index_tours(ids)
+        self.countries_changed.update(tour.country_id for tour in [*tours, *updates])
+        self.created['tour'] += len(tours)
+        self.updated['tour'] += len(updates)
@@ -0,0 +1,81 @@
+# toursntrips/dates.py
+"""
+Departure date windows for the tour list filters.
+
+Every date filter is resolved to a half-open [start, end) range so it
+becomes `departure_date >= start AND departure_date < end` – a range scan
+on the (country, departure_date, ...) indexes, where `__month` / `__year`
+lookups would have to extract the month from every row.
+"""
+import re
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.utils import timezone
+
+
+def parse_date(value):
+    """'2026-11-05' → date(2026, 11, 5); None if missing or malformed."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_int(value):
+    """'12' → 12; None unless plain ASCII digits ('²'.isdigit() is True too)."""
+    return int(value) if isinstance(value, str) and re.fullmatch(r'[0-9]+', value) else None
+
+
+def parse_decimal(value):
+    """'99.50' → Decimal('99.50'); None if missing, malformed or not finite ('NaN', 'Infinity')."""
+    try:
+        number = Decimal(value)
+    except (TypeError, ValueError, InvalidOperation):
+        return None
+    return number if number.is_finite() else None
+
+
+def month_range(month, year=None, today=None):
+    """
+    [first day of `month`, first day of the next month). Without a year
+    the next upcoming occurrence is used – the current month counts.
+    """
+    today = today or timezone.localdate()
+    if year is None:
+        year = today.year if month >= today.month else today.year + 1
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def departure_range(params, today=None):
+    """
+    The departure window asked for by ?departure_date=, ?month= (+ ?year=)
+    and ?date_from= / ?date_to= (both inclusive), intersected, as a
+    (start, end) pair where either side may be None. None when there is no
+    valid date filter; invalid values are ignored like the other filters.
+    """
+    bounds = []
+
+    departure_date = parse_date(params.get('departure_date'))
+    if departure_date and departure_date < date.max:
+        bounds.append((departure_date, departure_date + timedelta(days=1)))
+
+    month = parse_int(params.get('month'))
+    if month and 1 <= month <= 12:
+        year = parse_int(params.get('year'))
+        year = year if year and 1 <= year < date.max.year else None
+        bounds.append(month_range(month, year, today))
+
+    date_from = parse_date(params.get('date_from'))
+    date_to = parse_date(params.get('date_to'))
+    if date_from or date_to:
+        end = date_to + timedelta(days=1) if date_to and date_to < date.max else None
+        bounds.append((date_from, end))
+
+    if not bounds:
+        return None
+    starts = [start for start, _ in bounds if start]
+    ends = [end for _, end in bounds if end]
+    return (max(starts) if starts else None, min(ends) if ends else None)
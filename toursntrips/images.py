@@ -0,0 +1,146 @@
+# toursntrips/images.py
+"""
+Responsive WebP derivatives and metadata of tour images.
+
+Every uploaded TournTrips.image gets WebP copies at VARIANT_WIDTHS (never
+upscaled) next to it under <upload dir>/variants/. Their names are stored
+on the tour as
+
+    image_variants = {"source": "tours/<hash>.png", "webp": {"160": "tours/variants/<hash>.webp", ...}}
+
+so the serializer builds `srcset` without touching the files. "source"
+tells whether the variants still belong to the current image.
+
+The same pass stores the image's width, height, byte size, dominant color
+and a tiny blurred base64 placeholder on the tour, so clients can reserve
+layout space and paint something before the image arrives. signals.py
+clears them when the image is replaced.
+
+Generated by tasks.generate_tour_image_variants (queued by signals.py on
+upload) or in bulk by `manage.py generate_image_variants`.
+"""
+import base64
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageFilter, ImageOps
+
+from .cache import bump_catalog_version, country_scope
+from .models import TournTrips
+
+VARIANT_WIDTHS = (160, 320, 640, 1024)
+VARIANT_QUALITY = 80
+
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 40
+
+
+def variant_name(source_name, width):
+    """'tours/india-banner-4.png', 320 → 'tours/variants/india-banner-4-320w.webp'"""
+    directory, filename = posixpath.split(source_name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, 'variants', f'{stem}-{width}w.webp')
+
+
+def is_processed(tour):
+    """Variants and metadata exist and belong to the current image."""
+    return (
+        bool(tour.image)
+        and tour.image_variants.get('source') == tour.image.name
+        and tour.image_bytes is not None
+    )
+
+
+def open_image(image_field):
+    """The image as a loaded, upright RGB/RGBA Pillow image."""
+    with image_field.open('rb') as f, Image.open(f) as image:
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    return image
+
+
+def build_variants(image_field, image=None):
+    """Write the WebP derivatives of an image; returns {width: name}."""
+    storage = image_field.storage
+    image = image or open_image(image_field)
+
+    # Smaller widths plus one at (at most) the largest width – never upscaled
+    widths = sorted({w for w in VARIANT_WIDTHS if w < image.width} | {min(image.width, VARIANT_WIDTHS[-1])})
+
+    variants = {}
+    for width in widths:
+        if width == image.width:
+            resized = image
+        else:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        resized.save(buffer, 'WEBP', quality=VARIANT_QUALITY, method=6)
+
+        # The tour image storage renames it after its content hash (storage.py)
+        variants[str(width)] = storage.save(variant_name(image_field.name, width), ContentFile(buffer.getvalue()))
+    return variants
+
+
+def dominant_color(image):
+    """Most common color of a 5-color quantized thumbnail, as '#rrggbb'."""
+    small = image.convert('RGB')
+    small.thumbnail((64, 64))
+    quantized = small.quantize(colors=5)
+    _, index = max(quantized.getcolors())
+    r, g, b = quantized.getpalette()[index * 3:index * 3 + 3]
+    return f'#{r:02x}{g:02x}{b:02x}'
+
+
+def blur_placeholder(image):
+    """A PLACEHOLDER_WIDTH px wide, blurred WebP as a data: URI (a few hundred bytes)."""
+    height = max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))
+    tiny = image.convert('RGB').resize((PLACEHOLDER_WIDTH, height), Image.Resampling.BOX)
+    tiny = tiny.filter(ImageFilter.GaussianBlur(1))
+    buffer = BytesIO()
+    tiny.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def image_metadata(image_field, image=None):
+    """Model field values describing an image file."""
+    image = image or open_image(image_field)
+    return {
+        'image_width': image.width,
+        'image_height': image.height,
+        'image_bytes': image_field.size,
+        'image_color': dominant_color(image),
+        'image_placeholder': blur_placeholder(image),
+    }
+
+
+def process_tour_image(tour_id, force=False):
+    """
+    (Re)generate the variants and metadata of one tour's image and store
+    them on the tour. Returns False when there was nothing to do.
+    """
+    tour = TournTrips.objects.filter(pk=tour_id).only(
+        'id', 'country_id', 'image', 'image_variants', 'image_bytes'
+    ).first()
+    if tour is None or not tour.image:
+        return False
+    if is_processed(tour) and not force:
+        return False
+
+    image = open_image(tour.image)
+    image_variants = {'source': tour.image.name, 'webp': build_variants(tour.image, image)}
+    metadata = image_metadata(tour.image, image)
+
+    # update() skips the save signals (documents and search index don't hold
+    # images) – and does nothing if the image was replaced meanwhile
+    updated = TournTrips.objects.filter(pk=tour.pk, image=tour.image.name).update(
+        image_variants=image_variants, updated_at=timezone.now(), **metadata
+    )
+    if updated:
+        transaction.on_commit(lambda: bump_catalog_version(country_scope(tour.country_id)))
+    return bool(updated)
@@ -0,0 +1,70 @@
+import posixpath
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from toursntrips.cache import bump_catalog_version, country_scope
+from toursntrips.models import TournTrips
+from toursntrips.storage import content_hash
+
+
+class Command(BaseCommand):
+    help = 'Merge byte-identical TourTrips images into one content-hashed file and repoint the tours using them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report duplicates without changing anything')
+
+    def handle(self, *args, **options):
+        field = TournTrips._meta.get_field('image')
+        storage = field.storage
+        directory = field.upload_to.rstrip('/')
+
+        # content hash → names with those bytes (variants/ has its own names)
+        groups = defaultdict(list)
+        for filename in storage.listdir(directory)[1]:
+            name = posixpath.join(directory, filename)
+            with storage.open(name, 'rb') as f:
+                groups[(content_hash(f), posixpath.splitext(filename)[1].lower())].append(name)
+
+        duplicates = {key: sorted(names) for key, names in groups.items() if len(names) > 1}
+        self.stdout.write(f'{sum(len(n) for n in groups.values())} files, {len(duplicates)} groups of duplicates.')
+
+        merged = reclaimed = repointed = 0
+        for (digest, extension), names in sorted(duplicates.items()):
+            canonical = posixpath.join(directory, f'{digest}{extension}')
+            redundant = [name for name in names if name != canonical]
+            self.stdout.write(f'  {canonical} ← {", ".join(redundant)}')
+            reclaimed += storage.size(names[0]) * (len(names) - 1)  # one copy stays
+            if options['dry_run']:
+                continue
+
+            if not storage.exists(canonical):
+                with storage.open(names[0], 'rb') as f:
+                    storage.save(canonical, f)  # content-hashed storage keeps this exact name
+
+            repointed += self.repoint(redundant, canonical)
+            for name in redundant:
+                storage.delete(name)
+            merged += 1
+
+        verb = 'Would reclaim' if options['dry_run'] else f'Merged {merged} groups, repointed {repointed} tours, reclaimed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {reclaimed / 1024 / 1024:.1f} MB.'))
+
+    def repoint(self, names, canonical):
+        """Point tours using any of `names` at `canonical` – before the files go."""
+        with transaction.atomic():
+            tours = list(TournTrips.objects.select_for_update().filter(image__in=names).only(
+                'id', 'country_id', 'image', 'image_variants'
+            ))
+            for tour in tours:
+                # Same bytes, so the variants and metadata still apply
+                if tour.image_variants.get('source') == tour.image.name:
+                    tour.image_variants = {**tour.image_variants, 'source': canonical}
+                tour.image = canonical
+            # bulk_update skips the save signals – no variants task is queued
+            TournTrips.objects.bulk_update(tours, ['image', 'image_variants'])
+            TournTrips.objects.filter(id__in=[tour.id for tour in tours]).update(updated_at=timezone.now())
+            for country_id in {tour.country_id for tour in tours}:
+                transaction.on_commit(lambda scope=country_scope(country_id): bump_catalog_version(scope))
+        return len(tours)
@@ -0,0 +1,32 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from toursntrips.bulk import DEFAULT_BATCH_SIZE
+from toursntrips.catalog_io import write_csv, write_jsonl
+
+
+class Command(BaseCommand):
+    help = 'Stream continents, countries, adventure styles, destinations and TourTrips to JSONL or CSV (see catalog_io.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help='JSONL file ("-" for stdout) or, for CSV, a directory')
+        parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f'Rows fetched per query (default: {DEFAULT_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        path, batch_size = options['path'], options['batch_size']
+        if options['format'] == 'csv':
+            if path == '-':
+                raise CommandError('CSV export writes one file per type – give a directory')
+            counts = write_csv(path, batch_size)
+        elif path == '-':
+            counts = write_jsonl(sys.stdout, batch_size)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                counts = write_jsonl(f, batch_size)
+
+        summary = ', '.join(f'{count} {type}' for type, count in counts.items())
+        # stdout may be the export itself
+        self.stderr.write(self.style.SUCCESS(f'Exported {summary}.'))
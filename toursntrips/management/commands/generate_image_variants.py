@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from toursntrips.images import process_tour_image, is_processed
+from toursntrips.models import TournTrips
+from toursntrips.tasks import generate_tour_image_variants
+
+
+class Command(BaseCommand):
+    help = 'Generate the responsive WebP variants and metadata of every TourTrips image that lacks them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that are already up to date')
+        parser.add_argument('--queue', action='store_true', help='Queue Celery tasks instead of working in-process')
+
+    def handle(self, *args, **options):
+        tours = TournTrips.objects.exclude(image='').exclude(image__isnull=True).only('id', 'image', 'image_variants', 'image_bytes')
+        pending = [tour.pk for tour in tours.iterator() if options['force'] or not is_processed(tour)]
+        self.stdout.write(f'{len(pending)} tour images need processing...')
+
+        done = 0
+        for tour_id in pending:
+            if options['queue']:
+                generate_tour_image_variants.delay(tour_id)
+                done += 1
+                continue
+            try:
+                if process_tour_image(tour_id, force=options['force']):
+                    done += 1
+            except OSError as exc:
+                self.stderr.write(f'Tour {tour_id}: {exc}')
+
+        verb = 'Queued' if options['queue'] else 'Processed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {done} tour images.'))
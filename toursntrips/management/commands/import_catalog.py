@@ -0,0 +1,55 @@
+import os
+import sys
+from contextlib import nullcontext
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from toursntrips.bulk import DEFAULT_BATCH_SIZE
+from toursntrips.catalog_io import CatalogImporter, read_csv, read_jsonl
+
+
+class Command(BaseCommand):
+    help = 'Load a catalog written by export_catalog (JSONL file or CSV directory) with bulk inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSONL file ("-" for stdin) or a directory of CSV files')
+        parser.add_argument('--dry-run', action='store_true', help='Import, report and roll everything back')
+        parser.add_argument(
+            '--update-by-id', action='store_true',
+            help='Keep the exported tour ids (restoring a copy of the same database): overwrite the tour with '
+                 'that id or create it with that id. By default every tour record adds a new tour',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f'Rows inserted per transaction (default: {DEFAULT_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        importer = CatalogImporter(
+            options['batch_size'], progress=self.stdout.write, update_by_id=options['update_by_id'],
+        )
+
+        # A dry run is one transaction that is rolled back – chunks become savepoints
+        with transaction.atomic() if options['dry_run'] else nullcontext():
+            if path == '-':
+                total = importer.run(read_jsonl(sys.stdin))
+            elif os.path.isdir(path):
+                total = importer.run(read_csv(path))
+            elif os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    total = importer.run(read_jsonl(f))
+            else:
+                raise CommandError(f'{path} does not exist')
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+        summary = ', '.join(
+            f'{importer.created[type]} {type} created'
+            + (f', {importer.updated[type]} updated' if importer.updated[type] else '')
+            + f' ({importer.existing[type]} already present)'
+            for type in importer.created
+        )
+        verb = 'Dry run, rolled back' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total} records: {summary}.'))
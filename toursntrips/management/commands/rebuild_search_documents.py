@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from toursntrips.models import TourSearchDocument
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized TourSearchDocument row for every TourTrips instance'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Tours rebuilt per batch (default: 500)')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding tour search documents...')
+        total = TourSearchDocument.objects.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully rebuilt {total} search documents.')
+        )
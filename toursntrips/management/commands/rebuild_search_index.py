@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from toursntrips import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index (SQLite FTS5) for every TourTrips instance'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Tours indexed per batch (default: 500)')
+
+    def handle(self, *args, **options):
+        if not search.fts_enabled():
+            self.stdout.write(self.style.WARNING('Full-text index is only available on SQLite; nothing to do.'))
+            return
+
+        self.stdout.write('Rebuilding tour search index...')
+        total = search.rebuild_index(chunk_size=options['chunk_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully indexed {total} tours.')
+        )
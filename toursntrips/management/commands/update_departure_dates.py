@@ -1,27 +1,19 @@
-import random
-from decimal import Decimal
-from datetime import date
-from django.core.management.base import BaseCommand
-from toursntrips.models import TournTrips  # Replace 'toursntrips' with your actual Django app name
+from django.utils import timezone
+from toursntrips.bulk import BulkTourUpdateCommand
 
 
-
-class Command(BaseCommand):
+class Command(BulkTourUpdateCommand):
     help = 'Update departure_date to today for all TourTrips'
+    reindex_search = False  # dates aren't in the full-text index
 
     def handle(self, *args, **options):
-        # Fetch all instances
-        tours = TournTrips.objects.all()
-        total = tours.count()
-        self.stdout.write(f'Updating {total} TourTrips instances...')
+        # One date for the whole run, even if it crosses midnight
+        options['today'] = timezone.localdate()
+        super().handle(*args, **options)
 
-        today = date.today()
-        updated_count = 0
-        for tour in tours:
-            tour.departure_date = today
-            tour.save(update_fields=['departure_date'])
-            updated_count += 1
+    def get_queryset(self, options):
+        # Tours already departing today have nothing to change
+        return super().get_queryset(options).exclude(departure_date=options['today'])
 
-        self.stdout.write(
-            self.style.SUCCESS(f'Successfully updated {updated_count} instances with today\'s date ({today}).')
-        )
\ No newline at end of file
+    def update_values(self, options):
+        return {'departure_date': options['today']}
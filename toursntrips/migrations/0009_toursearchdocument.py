@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:33
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_search_documents(apps, schema_editor):
+    TournTrips = apps.get_model('toursntrips', 'TournTrips')
+    TourSearchDocument = apps.get_model('toursntrips', 'TourSearchDocument')
+
+    documents = []
+    for tour in TournTrips.objects.prefetch_related('destinations'):
+        destinations = list(tour.destinations.all())
+        price = tour.shadow_price
+        discount = tour.discount_percentage or Decimal('0')
+        documents.append(TourSearchDocument(
+            tour_id=tour.pk,
+            country_id=tour.country_id,
+            adventure_style_id=tour.adventure_styles_id,
+            shadow_price=price,
+            discount_percentage=tour.discount_percentage,
+            rating=tour.rating,
+            no_of_reviews=tour.no_of_reviews,
+            nights=tour._nights,
+            departure_date=tour.departure_date,
+            start_city=tour.start_city,
+            end_city=tour.end_city,
+            final_price=(price * (1 - discount / 100)).quantize(Decimal('0.01')) if price is not None else None,
+            savings=float(price * discount / 100) if price is not None else None,
+            popularity=float(tour.rating or 0) * tour.no_of_reviews,
+            destination_ids=''.join(f",{d.id}" for d in destinations) + ',' if destinations else '',
+            destination_cities=''.join(f"|{d.city}" for d in destinations) + '|' if destinations else '',
+        ))
+    TourSearchDocument.objects.bulk_create(documents, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('toursntrips', '0008_alter_tourntrips_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TourSearchDocument',
+            fields=[
+                ('tour', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='toursntrips.tourntrips')),
+                ('shadow_price', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+                ('discount_percentage', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('rating', models.DecimalField(decimal_places=1, max_digits=3)),
+                ('no_of_reviews', models.PositiveIntegerField(default=0)),
+                ('nights', models.PositiveSmallIntegerField(default=0)),
+                ('departure_date', models.DateField()),
+                ('start_city', models.CharField(max_length=255)),
+                ('end_city', models.CharField(max_length=255)),
+                ('final_price', models.DecimalField(decimal_places=2, max_digits=12, null=True)),
+                ('savings', models.FloatField(null=True)),
+                ('popularity', models.FloatField(default=0)),
+                ('destination_ids', models.TextField(blank=True, default='')),
+                ('destination_cities', models.TextField(blank=True, default='')),
+                ('adventure_style', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='toursntrips.adventurestyle')),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='toursntrips.country')),
+            ],
+            options={
+                'verbose_name_plural': 'Tour Search Documents',
+                'indexes': [models.Index(fields=['country', 'departure_date', 'tour'], name='tsd_country_departure')],
+            },
+        ),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+    ]
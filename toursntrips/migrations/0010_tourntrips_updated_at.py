@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('toursntrips', '0009_toursearchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tourntrips',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:40
+
+from django.db import migrations
+
+FTS_TABLE = 'toursntrips_tour_fts'
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return  # search falls back to icontains on other backends
+
+    TournTrips = apps.get_model('toursntrips', 'TournTrips')
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        f"title, destinations, cities, country, country_id UNINDEXED, "
+        f"tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+    rows = []
+    for tour in TournTrips.objects.select_related('country').prefetch_related('destinations'):
+        destinations = list(tour.destinations.all())
+        cities = {d.city for d in destinations if d.city}
+        cities.update(c for c in (tour.start_city, tour.end_city) if c)
+        rows.append((
+            tour.pk,
+            tour.title,
+            ' '.join(f"{d.name} {d.description or ''}" for d in destinations),
+            ' '.join(sorted(cities)),
+            f"{tour.country.name} {tour.country.code}",
+            tour.country_id,
+        ))
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, destinations, cities, country, country_id) "
+            f"VALUES (%s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('toursntrips', '0010_tourntrips_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def populate_slugs(apps, schema_editor):
+    for model_name in ('Continent', 'Country'):
+        model = apps.get_model('toursntrips', model_name)
+        taken = set()
+        rows = list(model.objects.order_by('id'))
+        for row in rows:
+            base = slugify(row.name) or 'item'
+            slug, n = base, 1
+            while slug in taken:
+                n += 1
+                slug = f"{base}-{n}"
+            taken.add(slug)
+            row.slug = slug
+        model.objects.bulk_update(rows, ['slug'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('toursntrips', '0011_tour_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='continent',
+            name='slug',
+            field=models.SlugField(editable=False, max_length=120, null=True),
+        ),
+        migrations.AddField(
+            model_name='country',
+            name='slug',
+            field=models.SlugField(editable=False, max_length=120, null=True),
+        ),
+        migrations.RunPython(populate_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='continent',
+            name='slug',
+            field=models.SlugField(editable=False, max_length=120, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='country',
+            name='slug',
+            field=models.SlugField(editable=False, max_length=120, unique=True),
+        ),
+    ]
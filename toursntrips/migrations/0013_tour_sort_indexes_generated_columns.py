@@ -0,0 +1,75 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:42
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.math
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('toursntrips', '0012_continent_country_slug'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tourntrips',
+            name='final_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast('shadow_price', models.FloatField()), '*', django.db.models.expressions.CombinedExpression(models.Value(100.0), '-', django.db.models.functions.comparison.Cast('discount_percentage', models.FloatField()))), '/', models.Value(100.0)), 2), output_field=models.DecimalField(decimal_places=2, max_digits=12, null=True)),
+        ),
+        migrations.AddField(
+            model_name='tourntrips',
+            name='popularity',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast('rating', models.FloatField()), '*', django.db.models.functions.comparison.Cast('no_of_reviews', models.FloatField())), output_field=models.FloatField()),
+        ),
+        migrations.AddField(
+            model_name='tourntrips',
+            name='savings',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast('shadow_price', models.FloatField()), '*', django.db.models.functions.comparison.Cast('discount_percentage', models.FloatField())), '/', models.Value(100.0)), output_field=models.FloatField(null=True)),
+        ),
+        migrations.AddIndex(
+            model_name='tourntrips',
+            index=models.Index(fields=['country', 'shadow_price', 'id'], name='tour_country_price'),
+        ),
+        migrations.AddIndex(
+            model_name='tourntrips',
+            index=models.Index(fields=['country', '_nights', 'id'], name='tour_country_nights'),
+        ),
+        migrations.AddIndex(
+            model_name='tourntrips',
+            index=models.Index(fields=['country', 'no_of_reviews', 'id'], name='tour_country_reviews'),
+        ),
+        migrations.AddIndex(
+            model_name='tourntrips',
+            index=models.Index(fields=['country', 'departure_date', 'id'], name='tour_country_departure'),
+        ),
+        migrations.AddIndex(
+            model_name='tourntrips',
+            index=models.Index(fields=['country', 'savings', 'id'], name='tour_country_savings'),
+        ),
+        migrations.AddIndex(
+            model_name='tourntrips',
+            index=models.Index(fields=['country', 'popularity', 'id'], name='tour_country_popularity'),
+        ),
+        migrations.AddIndex(
+            model_name='toursearchdocument',
+            index=models.Index(fields=['country', 'shadow_price', 'tour'], name='tsd_country_price'),
+        ),
+        migrations.AddIndex(
+            model_name='toursearchdocument',
+            index=models.Index(fields=['country', 'nights', 'tour'], name='tsd_country_nights'),
+        ),
+        migrations.AddIndex(
+            model_name='toursearchdocument',
+            index=models.Index(fields=['country', 'no_of_reviews', 'tour'], name='tsd_country_reviews'),
+        ),
+        migrations.AddIndex(
+            model_name='toursearchdocument',
+            index=models.Index(fields=['country', 'savings', 'tour'], name='tsd_country_savings'),
+        ),
+        migrations.AddIndex(
+            model_name='toursearchdocument',
+            index=models.Index(fields=['country', 'popularity', 'tour'], name='tsd_country_popularity'),
+        ),
+    ]
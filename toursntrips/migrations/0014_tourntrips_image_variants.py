@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('toursntrips', '0013_tour_sort_indexes_generated_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tourntrips',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:49
+
+import toursntrips.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('toursntrips', '0015_tourntrips_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tourntrips',
+            name='image',
+            field=models.ImageField(blank=True, help_text='Upload a cover image for the tour (optional)', null=True, storage=toursntrips.storage.tour_image_storage, upload_to='tours/', verbose_name='Tour Image'),
+        ),
+    ]
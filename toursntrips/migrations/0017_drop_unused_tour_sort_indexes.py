@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('toursntrips', '0016_tourntrips_image_storage'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tourntrips',
+            name='tour_country_price',
+        ),
+        migrations.RemoveIndex(
+            model_name='tourntrips',
+            name='tour_country_nights',
+        ),
+        migrations.RemoveIndex(
+            model_name='tourntrips',
+            name='tour_country_reviews',
+        ),
+        migrations.RemoveIndex(
+            model_name='tourntrips',
+            name='tour_country_savings',
+        ),
+        migrations.RemoveIndex(
+            model_name='tourntrips',
+            name='tour_country_popularity',
+        ),
+    ]
@@ -7,15 +7,56 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 # Make Destination model with fields for country. It will include different tourist attractions within a country
 
 
+import re
+
 from django.db import models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Cast, Round
+from django.utils.text import slugify
+
+from .storage import tour_image_storage
+
+
+def unique_slug(instance, value, taken=None):
+    """
+    slugify(value), suffixed -2, -3, ... if another row already has it.
+    Bulk inserts pass the slugs in use as `taken`; the new one is added.
+    """
+    base = slugify(value) or 'item'
+    if taken is None:
+        others = type(instance).objects.exclude(pk=instance.pk)
+        in_use = lambda slug: others.filter(slug=slug).exists()
+    else:
+        in_use = taken.__contains__
+    slug, n = base, 1
+    while in_use(slug):
+        n += 1
+        slug = f"{base}-{n}"
+    if taken is not None:
+        taken.add(slug)
+    return slug
+
+
+def slug_fits(slug, value):
+    """Whether `slug` is what unique_slug() gives `value`, suffix included ('costa-rica-2')."""
+    base = slugify(value) or 'item'
+    return bool(slug) and re.fullmatch(rf'{re.escape(base)}(-[0-9]+)?', slug) is not None
+
 
 class Continent(models.Model):
     name = models.CharField(max_length=100, unique=True)
     code = models.CharField(max_length=10, blank=True, null=True)  # e.g., 'AF' for Africa
+    slug = models.SlugField(max_length=120, unique=True, editable=False)  # e.g., 'south-america', kept in sync with the name
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # A rename gets the new name's slug; an unchanged name keeps its (suffixed) one
+        if not slug_fits(self.slug, self.name):
+            self.slug = unique_slug(self, self.name)
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name_plural = "Continents"
 
@@ -24,10 +65,17 @@ class Country(models.Model):
     name = models.CharField(max_length=100, unique=True)
     code = models.CharField(max_length=3, unique=True)  # ISO 3-letter code, e.g., 'USA'
     continent = models.ForeignKey(Continent, on_delete=models.CASCADE, related_name='countries')
+    slug = models.SlugField(max_length=120, unique=True, editable=False)  # e.g., 'costa-rica', kept in sync with the name
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # A rename gets the new name's slug; an unchanged name keeps its (suffixed) one
+        if not slug_fits(self.slug, self.name):
+            self.slug = unique_slug(self, self.name)
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name_plural = "Countries"
         ordering = ['name']
@@ -69,11 +117,19 @@ class TournTrips(models.Model):
     # NEW: Image field for tour cover/thumbnail
     image = models.ImageField(
         upload_to='tours/',
+        storage=tour_image_storage,  # content-hashed names, see storage.py
         null=True,
         blank=True,
         verbose_name="Tour Image",
         help_text="Upload a cover image for the tour (optional)",
     )
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)  # WebP derivatives, see images.py
+    # Image metadata, filled with the variants (images.py) – served without file I/O
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_bytes = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_color = models.CharField(max_length=7, blank=True, default='', editable=False)  # dominant, '#rrggbb'
+    image_placeholder = models.TextField(blank=True, default='', editable=False)         # blurred data: URI
     title = models.CharField(max_length=255)
     country = models.ForeignKey(Country, on_delete=models.PROTECT, related_name='tours')  # Changed to ForeignKey for dropdown in admin
     duration = models.CharField(max_length=32)
@@ -104,6 +160,28 @@ class TournTrips(models.Model):
     adventure_styles = models.ForeignKey(AdventureStyle, on_delete=models.PROTECT, related_name='tours')  # Changed to ForeignKey for dropdown in admin
     start_city = models.CharField(max_length=255)
     end_city = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)  # drives ETag / Last-Modified
+
+    # Stored generated columns – computed by the database on every write and
+    # copied to TourSearchDocument, whose (country, <key>, tour) indexes sort by them
+    final_price = models.GeneratedField(  # price after discount
+        expression=Round(
+            Cast('shadow_price', models.FloatField()) * (100.0 - Cast('discount_percentage', models.FloatField())) / 100.0,
+            2,
+        ),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2, null=True),
+        db_persist=True,
+    )
+    savings = models.GeneratedField(  # price × discount / 100
+        expression=Cast('shadow_price', models.FloatField()) * Cast('discount_percentage', models.FloatField()) / 100.0,
+        output_field=models.FloatField(null=True),
+        db_persist=True,
+    )
+    popularity = models.GeneratedField(  # rating × reviews
+        expression=Cast('rating', models.FloatField()) * Cast('no_of_reviews', models.FloatField()),
+        output_field=models.FloatField(),
+        db_persist=True,
+    )
 
     def __str__(self):
         return self.title
@@ -116,11 +194,15 @@ class TournTrips(models.Model):
     # ------------------------------------------------------------------
     def save(self, *args, **kwargs):
         # Build the string **before** we call super().save()
+        self.set_duration()
+        super().save(*args, **kwargs)
+
+    def set_duration(self):
+        # Also called by bulk inserts (catalog_io.py), which skip save()
         if self._days or self._nights:
             self.duration = f"{self._nights} nights {self._days} days"
         else:
             self.duration = ""
-        super().save(*args, **kwargs)
 
     # Optional: nice display in admin list / detail
     @property
@@ -138,4 +220,127 @@ class TournTrips(models.Model):
         return self.title
 
     class Meta:
-        verbose_name_plural = "Tour Trips"
\ No newline at end of file
+        verbose_name_plural = "Tour Trips"
+        # The departure calendar: WHERE country = ? AND departure_date BETWEEN ...
+        # (listings sort TourSearchDocument, which carries the sort-mode indexes)
+        indexes = [
+            models.Index(fields=['country', 'departure_date', 'id'], name='tour_country_departure'),
+        ]
+
+
+
+# ----------------------------------------------------------------------
+# Denormalized search document – one row per tour, kept in sync by
+# toursntrips/signals.py so the country tours list never joins or does
+# per-row arithmetic.
+# ----------------------------------------------------------------------
+class TourSearchDocumentManager(models.Manager):
+
+    def sync_tours(self, tour_ids):
+        """
+        Rebuild the documents for the given tour ids (upsert).
+        Documents of deleted tours go away through the OneToOne cascade.
+        """
+        tour_ids = list(set(tour_ids))
+        if not tour_ids:
+            return 0
+        tours = TournTrips.objects.filter(id__in=tour_ids).prefetch_related('destinations')
+        documents = [self.model.from_tour(tour) for tour in tours]
+        self.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=['tour'],
+            update_fields=[f.name for f in self.model._meta.concrete_fields if not f.primary_key],
+        )
+        return len(documents)
+
+    def sync_tour_fields(self, tour_ids):
+        """
+        Refresh only the columns copied from the tours, in one set-based
+        UPDATE – for bulk changes that leave the destinations alone.
+        """
+        tour_ids = list(set(tour_ids))
+        tours = TournTrips.objects.filter(pk=OuterRef('tour_id'))
+        updated = self.filter(tour_id__in=tour_ids).update(**{
+            name: Subquery(tours.values(source))
+            for name, source in self.model.TOUR_FIELDS.items()
+        })
+        if updated != len(tour_ids):
+            return self.sync_tours(tour_ids)  # some documents are missing – build them
+        return updated
+
+    def rebuild(self, chunk_size=500):
+        """Rebuild every document, `chunk_size` tours at a time."""
+        ids = list(TournTrips.objects.order_by('id').values_list('id', flat=True))
+        total = 0
+        for start in range(0, len(ids), chunk_size):
+            total += self.sync_tours(ids[start:start + chunk_size])
+        return total
+
+
+class TourSearchDocument(models.Model):
+    tour = models.OneToOneField(TournTrips, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name='+')
+    adventure_style = models.ForeignKey(AdventureStyle, on_delete=models.CASCADE, related_name='+')
+
+    # Copied from the tour
+    shadow_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    discount_percentage = models.DecimalField(max_digits=10, decimal_places=2)
+    rating = models.DecimalField(max_digits=3, decimal_places=1)
+    no_of_reviews = models.PositiveIntegerField(default=0)
+    nights = models.PositiveSmallIntegerField(default=0)
+    departure_date = models.DateField()
+    start_city = models.CharField(max_length=255)
+    end_city = models.CharField(max_length=255)
+
+    # Precomputed
+    final_price = models.DecimalField(max_digits=12, decimal_places=2, null=True)  # price after discount
+    savings = models.FloatField(null=True)                                         # price × discount / 100
+    popularity = models.FloatField(default=0)                                       # rating × reviews
+    destination_ids = models.TextField(blank=True, default='')     # ",3,17,42," → contains ",17,"
+    destination_cities = models.TextField(blank=True, default='')  # "|Agra|Delhi|"
+
+    # document field → TournTrips attribute it is copied from
+    TOUR_FIELDS = {
+        'country_id': 'country_id',
+        'adventure_style_id': 'adventure_styles_id',
+        'shadow_price': 'shadow_price',
+        'discount_percentage': 'discount_percentage',
+        'rating': 'rating',
+        'no_of_reviews': 'no_of_reviews',
+        'nights': '_nights',
+        'departure_date': 'departure_date',
+        'start_city': 'start_city',
+        'end_city': 'end_city',
+        'final_price': 'final_price',   # generated columns on the tour
+        'savings': 'savings',
+        'popularity': 'popularity',
+    }
+
+    objects = TourSearchDocumentManager()
+
+    class Meta:
+        verbose_name_plural = "Tour Search Documents"
+        # One per CountryToursListView sort mode: WHERE country = ? ORDER BY <key>, tour
+        indexes = [
+            models.Index(fields=['country', 'departure_date', 'tour'], name='tsd_country_departure'),
+            models.Index(fields=['country', 'shadow_price', 'tour'], name='tsd_country_price'),
+            models.Index(fields=['country', 'nights', 'tour'], name='tsd_country_nights'),
+            models.Index(fields=['country', 'no_of_reviews', 'tour'], name='tsd_country_reviews'),
+            models.Index(fields=['country', 'savings', 'tour'], name='tsd_country_savings'),
+            models.Index(fields=['country', 'popularity', 'tour'], name='tsd_country_popularity'),
+        ]
+
+    def __str__(self):
+        return f"Search document for tour #{self.tour_id}"
+
+    @classmethod
+    def from_tour(cls, tour):
+        """Build (unsaved) the document for a tour with destinations prefetched."""
+        destinations = list(tour.destinations.all())
+        return cls(
+            tour_id=tour.pk,
+            **{name: getattr(tour, source) for name, source in cls.TOUR_FIELDS.items()},
+            destination_ids=''.join(f",{d.id}" for d in destinations) + ',' if destinations else '',
+            destination_cities=''.join(f"|{d.city}" for d in destinations) + '|' if destinations else '',
+        )
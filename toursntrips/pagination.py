@@ -1,8 +1,180 @@
 # api/pagination.py
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class TenPerPagePagination(PageNumberPagination):
     page_size = 2
     page_size_query_param = 'page_size'
-    max_page_size = 100
\ No newline at end of file
+    max_page_size = 100
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination that seeks on the queryset's own ordering.
+
+    Unlike DRF's CursorPagination, the ordering is read from the queryset
+    (so every `?filter=` sort mode works unchanged) and ties are broken on
+    the primary key, which keeps pages stable and lets every page be served
+    with a `WHERE (key, id) > (...)` seek instead of COUNT(*) + OFFSET.
+
+    NULL sort values (e.g. a missing shadow_price) are treated as the
+    smallest value, which matches how SQLite orders them.
+
+    Response: { next, previous, results }
+    """
+    page_size = TenPerPagePagination.page_size
+    page_size_query_param = TenPerPagePagination.page_size_query_param
+    max_page_size = TenPerPagePagination.max_page_size
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.ordering = self.get_keyset_ordering(queryset)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            reverse, position = False, None
+        else:
+            reverse, position = self.cursor
+
+        ordering = [(field, desc != reverse) for field, desc in self.ordering]
+        queryset = queryset.order_by(*[('-' + f) if desc else f for f, desc in ordering])
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > self.page_size
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = position is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = position is not None
+
+        self._position = position
+        return self.page
+
+    def get_keyset_ordering(self, queryset):
+        """
+        Returns [(field, descending), ...] for the queryset, always ending
+        with the primary key so that every position is unique.
+        """
+        ordering = []
+        for field in queryset.query.order_by or ():
+            if not isinstance(field, str):
+                raise TypeError('KeysetPagination only supports ordering by field names.')
+            ordering.append((field.lstrip('-'), field.startswith('-')))
+
+        if not ordering or ordering[-1][0] not in ('pk', 'id', queryset.model._meta.pk.attname):
+            descending = ordering[-1][1] if ordering else False
+            ordering.append(('pk', descending))
+        return ordering
+
+    def _seek_filter(self, ordering, position):
+        """
+        Builds the lexicographic "strictly after `position`" condition:
+        (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (field, desc), value in zip(ordering, position):
+            if value is None:
+                after = Q(pk__in=[]) if desc else Q(**{field + '__isnull': False})
+                same = Q(**{field + '__isnull': True})
+            else:
+                if desc:
+                    after = Q(**{field + '__lt': value}) | Q(**{field + '__isnull': True})
+                else:
+                    after = Q(**{field + '__gt': value})
+                same = Q(**{field: value})
+            condition |= equal & after
+            equal &= same
+        return condition
+
+    def _position_from_instance(self, instance):
+        return [getattr(instance, field) for field, _ in self.ordering]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self._position_from_instance(self.page[-1])
+        else:
+            position = self._position
+        return self.encode_cursor((False, position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self._position_from_instance(self.page[0])
+        else:
+            position = self._position
+        return self.encode_cursor((True, position))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            reverse = bool(payload['r'])
+            position = list(payload['p'])
+        except (TypeError, ValueError, KeyError, binascii.Error, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            # Typed like the sort keys, so a tampered value can't reach the query
+            position = [
+                None if value is None else self._ordering_field(field).to_python(value)
+                for (field, _), value in zip(self.ordering, position)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, position
+
+    def _ordering_field(self, name):
+        opts = self.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    def encode_cursor(self, cursor):
+        reverse, position = cursor
+        payload = json.dumps({'r': int(reverse), 'p': position}, default=str, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_html_context(self):
+        return {
+            'previous_url': self.get_previous_link(),
+            'next_url': self.get_next_link(),
+        }
@@ -0,0 +1,112 @@
+# toursntrips/search.py
+"""
+Full-text search over tours, backed by an SQLite FTS5 virtual table.
+
+One FTS row per tour (rowid = tour id) holding the tour title, its
+destination names and descriptions, cities and country name/code. The
+table is created by migration 0011 and kept current by
+toursntrips/signals.py; `rebuild_search_index` rebuilds it from scratch.
+
+On other database backends search_tour_ids() falls back to icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import TournTrips
+
+FTS_TABLE = 'toursntrips_tour_fts'
+
+# bm25() column weights: title, destinations, cities, country
+BM25_WEIGHTS = (10.0, 5.0, 3.0, 2.0)
+
+MAX_RESULTS = 1000
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def _tour_row(tour):
+    destinations = list(tour.destinations.all())
+    cities = {d.city for d in destinations if d.city}
+    cities.update(c for c in (tour.start_city, tour.end_city) if c)
+    return (
+        tour.pk,
+        tour.title,
+        ' '.join(f"{d.name} {d.description or ''}" for d in destinations),
+        ' '.join(sorted(cities)),
+        f"{tour.country.name} {tour.country.code}",
+        tour.country_id,
+    )
+
+
+def index_tours(tour_ids):
+    """(Re)index the given tours; ids of deleted tours are dropped."""
+    tour_ids = list(set(tour_ids))
+    if not tour_ids or not fts_enabled():
+        return
+    tours = TournTrips.objects.filter(id__in=tour_ids).select_related('country').prefetch_related('destinations')
+    rows = [_tour_row(tour) for tour in tours]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(tour_ids))})",
+            tour_ids,
+        )
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, destinations, cities, country, country_id) "
+            f"VALUES (%s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def rebuild_index(chunk_size=500):
+    if not fts_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    ids = list(TournTrips.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), chunk_size):
+        index_tours(ids[start:start + chunk_size])
+    return len(ids)
+
+
+def build_match_query(text):
+    """
+    Turn free user text into a safe FTS5 query: every word becomes a
+    quoted prefix term and all of them must match ("eiff tow" → eiffel tower).
+    """
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_tour_ids(text, country_id=None, limit=MAX_RESULTS):
+    """Tour ids matching `text`, best match first."""
+    match = build_match_query(text)
+    if not match:
+        return []
+
+    if not fts_enabled():
+        queryset = TournTrips.objects.all()
+        for word in re.findall(r'\w+', text):
+            queryset = queryset.filter(
+                Q(title__icontains=word)
+                | Q(destinations__name__icontains=word)
+                | Q(destinations__city__icontains=word)
+                | Q(country__name__icontains=word)
+            )
+        if country_id:
+            queryset = queryset.filter(country_id=country_id)
+        return list(queryset.order_by('departure_date', 'id').values_list('id', flat=True).distinct()[:limit])
+
+    sql = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+    params = [match]
+    if country_id:
+        sql += " AND country_id = %s"
+        params.append(country_id)
+    sql += f" ORDER BY bm25({FTS_TABLE}, {', '.join(str(w) for w in BM25_WEIGHTS)}), rowid LIMIT %s"
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
@@ -1,3 +1,4 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import (Country, 
                      Continent, 
@@ -10,7 +11,7 @@ from .models import (Country,
 class CountrySerializer(serializers.ModelSerializer):
     class Meta:
         model = Country
-        fields = ['id', 'name', 'code']
+        fields = ['id', 'name', 'code', 'slug']
 
 
 class ContinentWithCountriesSerializer(serializers.ModelSerializer):
@@ -18,10 +19,24 @@ class ContinentWithCountriesSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Continent
-        fields = ['id', 'name', 'code', 'countries']
+        fields = ['id', 'name', 'code', 'slug', 'countries']
 
 
 
+class CatalogTreeCountrySerializer(CountrySerializer):
+    """A country with the tour annotations added by CatalogTreeView."""
+    tour_count = serializers.IntegerField(read_only=True)
+    min_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)  # lowest final_price
+    next_departure = serializers.DateField(read_only=True)
+
+    class Meta(CountrySerializer.Meta):
+        fields = CountrySerializer.Meta.fields + ['tour_count', 'min_price', 'next_departure']
+
+
+class CatalogTreeSerializer(ContinentWithCountriesSerializer):
+    countries = CatalogTreeCountrySerializer(many=True, read_only=True)
+
+
 class AdventureStyleSerializer(serializers.ModelSerializer):
     class Meta:
         model = AdventureStyle
@@ -39,6 +54,18 @@ class DestinationSerializer(serializers.ModelSerializer):
 
 
 
+def destination_names_prefetch():
+    """
+    Prefetch that loads only destination names onto `tour.destination_names`.
+    Use with TournTripsSerializer so listing N tours costs one extra query.
+    """
+    return Prefetch(
+        'destinations',
+        queryset=Destination.objects.only('id', 'name'),
+        to_attr='destination_names',
+    )
+
+
 class TournTripsSerializer(serializers.ModelSerializer):
     country = serializers.CharField(source='country.name', read_only=True)
     country_id = serializers.IntegerField(source='country.id', read_only=True)
@@ -51,6 +78,9 @@ class TournTripsSerializer(serializers.ModelSerializer):
 
     # NEW: Image field with absolute URL (requires request in serializer context)
     image = serializers.SerializerMethodField()
+    # WebP derivatives: [{width, url}, ...] and the matching srcset string
+    image_variants = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = TournTrips
@@ -59,7 +89,8 @@ class TournTripsSerializer(serializers.ModelSerializer):
             'duration', 'duration_display', '_days', '_nights',
             'rating', 'no_of_reviews',
             'destinations',
-            'image',
+            'image', 'image_variants', 'image_srcset',
+            'image_width', 'image_height', 'image_bytes', 'image_color', 'image_placeholder',
             'shadow_price', 'discount_percentage',
             'departure_date', 'departure_date_us',
             'adventure_style',
@@ -67,6 +98,12 @@ class TournTripsSerializer(serializers.ModelSerializer):
         ]
 
     def get_destinations(self, obj):
+        # Fast paths: names from destination_names_prefetch() or a plain prefetch
+        names = getattr(obj, 'destination_names', None)
+        if names is not None:
+            return [d.name for d in names]
+        if 'destinations' in getattr(obj, '_prefetched_objects_cache', {}):
+            return [d.name for d in obj.destinations.all()]
         return list(obj.destinations.values_list('name', flat=True))
     
     # NEW: Method to return absolute image URL (e.g., http://127.0.0.1:8000/media/tours/filename.jpg)
@@ -81,6 +118,24 @@ class TournTripsSerializer(serializers.ModelSerializer):
                 return obj.image.url
         return None  # No image uploaded
 
+    def _media_url(self, url):
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def get_image_variants(self, obj):
+        # Names are stored on the tour (images.py) – no file access here
+        variants = obj.image_variants or {}
+        if not obj.image or variants.get('source') != obj.image.name:
+            return []  # not generated yet, or for a previous image
+        storage = obj.image.storage
+        return [
+            {'width': int(width), 'url': self._media_url(storage.url(name))}
+            for width, name in sorted(variants.get('webp', {}).items(), key=lambda item: int(item[0]))
+        ]
+
+    def get_image_srcset(self, obj):
+        return ', '.join(f"{variant['url']} {variant['width']}w" for variant in self.get_image_variants(obj)) or None
+
 
 class CitySerializer(serializers.Serializer):
     """
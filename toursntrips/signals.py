@@ -0,0 +1,165 @@
+# toursntrips/signals.py
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from . import search
+from .cache import GLOBAL, bump_catalog_version, country_scope
+from .models import Continent, Country, AdventureStyle, TournTrips, Destination, TourSearchDocument
+from .tasks import generate_tour_image_variants
+
+
+# ------------------------------------------------------------------
+# Keep TourSearchDocument and the full-text index in step with tours
+# ------------------------------------------------------------------
+def refresh_tours(tour_ids):
+    tour_ids = list(tour_ids)
+    TourSearchDocument.objects.sync_tours(tour_ids)
+    search.index_tours(tour_ids)
+
+
+@receiver(post_save, sender=TournTrips)
+def sync_search_document_on_tour_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return  # loaddata – run `rebuild_search_documents` / `rebuild_search_index` afterwards
+    refresh_tours([instance.pk])
+
+
+@receiver(post_delete, sender=TournTrips)
+def remove_tour_from_search_index(sender, instance, **kwargs):
+    search.index_tours([instance.pk])  # the tour is gone, so its row is dropped
+
+
+@receiver(m2m_changed, sender=TournTrips.destinations.through)
+def sync_search_document_on_destinations_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # destination.tours.clear() – remember who is affected before the rows go
+        instance._cleared_tour_ids = list(instance.tours.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        refresh_tours([instance.pk])
+    elif action == 'post_clear':
+        refresh_tours(getattr(instance, '_cleared_tour_ids', []))
+    else:
+        refresh_tours(pk_set or [])
+
+
+@receiver(post_save, sender=Destination)
+def sync_search_documents_on_destination_save(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return  # a brand-new destination has no tours yet
+    refresh_tours(instance.tours.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Destination)
+def remember_destination_tours(sender, instance, **kwargs):
+    # The through rows are removed by the cascade without an m2m_changed signal
+    instance._deleted_tour_ids = list(instance.tours.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Destination)
+def sync_search_documents_on_destination_delete(sender, instance, **kwargs):
+    refresh_tours(getattr(instance, '_deleted_tour_ids', []))
+
+
+@receiver(post_save, sender=Country)
+def reindex_country_tours(sender, instance, created, raw=False, **kwargs):
+    # Country name/code are part of the full-text index
+    if created or raw:
+        return
+    search.index_tours(instance.tours.values_list('id', flat=True))
+
+
+
+# ------------------------------------------------------------------
+# Catalog versions – invalidate cached catalog responses (cache.py)
+# Bumped on commit so a concurrent request can't cache pre-commit data
+# under the new version.
+# ------------------------------------------------------------------
+def bump_on_commit(*scopes):
+    def bump():
+        for scope in set(scopes):
+            bump_catalog_version(scope)
+    transaction.on_commit(bump)
+
+
+@receiver(pre_save, sender=TournTrips)
+def remember_tour_state(sender, instance, raw=False, **kwargs):
+    # A tour moved to another country invalidates both countries;
+    # a new image needs new variants (see queue_image_variants)
+    if instance.pk and not raw:
+        instance._previous_country_id, instance._previous_image = (
+            TournTrips.objects.filter(pk=instance.pk).values_list('country_id', 'image').first() or (None, None)
+        )
+
+
+@receiver(post_save, sender=TournTrips)
+@receiver(post_delete, sender=TournTrips)
+def bump_version_on_tour_change(sender, instance, **kwargs):
+    scopes = [country_scope(instance.country_id)]
+    previous = getattr(instance, '_previous_country_id', None)
+    if previous and previous != instance.country_id:
+        scopes.append(country_scope(previous))
+    bump_on_commit(*scopes)
+
+
+@receiver(post_save, sender=TournTrips)
+def queue_image_variants(sender, instance, created, raw=False, **kwargs):
+    # Compared with the stored name: an upload's name is only final once the
+    # storage saved it, and identical bytes come back under the same hash
+    if raw:
+        return
+    image = instance.image.name or ''
+    if not created:
+        if image == (getattr(instance, '_previous_image', image) or ''):
+            return
+        # Metadata of the old image – refilled by the variants task
+        instance.image_width = instance.image_height = instance.image_bytes = None
+        instance.image_color = instance.image_placeholder = ''
+        TournTrips.objects.filter(pk=instance.pk).update(
+            image_width=None, image_height=None, image_bytes=None, image_color='', image_placeholder='',
+        )
+    if image:
+        transaction.on_commit(lambda: generate_tour_image_variants.delay(instance.pk))
+
+
+@receiver(m2m_changed, sender=TournTrips.destinations.through)
+def bump_version_on_destinations_change(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        # Tour (forward) or Destination (reverse) – both carry a country
+        bump_on_commit(country_scope(instance.country_id))
+
+
+@receiver(pre_save, sender=Destination)
+def remember_destination_country(sender, instance, raw=False, **kwargs):
+    # A destination moved to another country invalidates both countries
+    if instance.pk and not raw:
+        instance._previous_country_id = (
+            Destination.objects.filter(pk=instance.pk).values_list('country_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Destination)
+@receiver(post_delete, sender=Destination)
+def bump_version_on_destination_change(sender, instance, **kwargs):
+    scopes = [country_scope(instance.country_id)]
+    previous = getattr(instance, '_previous_country_id', None)
+    if previous and previous != instance.country_id:
+        scopes.append(country_scope(previous))
+    bump_on_commit(*scopes)
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+def bump_version_on_country_change(sender, instance, **kwargs):
+    bump_on_commit(GLOBAL, country_scope(instance.pk))
+
+
+@receiver(post_save, sender=Continent)
+@receiver(post_delete, sender=Continent)
+@receiver(post_save, sender=AdventureStyle)
+@receiver(post_delete, sender=AdventureStyle)
+def bump_global_version(sender, instance, **kwargs):
+    bump_on_commit(GLOBAL)
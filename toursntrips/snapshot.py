@@ -0,0 +1,183 @@
+# toursntrips/snapshot.py
+"""
+Optional in-process catalog snapshot for CountryToursListView.
+
+Each worker loads every TourSearchDocument once into NumPy columns
+(price, savings, popularity, reviews, nights, departure ordinal, country,
+style, start/end city codes and a destination bitset per tour) and
+answers the list filters and sort modes with vectorized masks and a
+lexsort – no database query until the page of tours is loaded.
+
+The snapshot is kept per process (cache.ProcessCache) and rebuilt when
+the ANY catalog version moves, so it is never older than the last
+committed catalog change.
+
+Enable with CATALOG_SNAPSHOT_ENGINE = True; requires numpy. When numpy
+is missing or a request uses something the snapshot doesn't model
+(?ordering=, cursor pagination) the ORM path is used instead.
+"""
+from django.conf import settings
+
+from .cache import ProcessCache
+from .dates import departure_range, parse_decimal, parse_int
+from .models import Country, Destination, TourSearchDocument
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+
+SORT_MODES = {
+    # ?filter=...       (column, descending)
+    'price=low': ('price', False),
+    'price=high': ('price', True),
+    'duration=short': ('nights', False),
+    'duration=long': ('nights', True),
+    'reviews=most': ('reviews', True),
+    'discount=high': ('savings', True),
+    'popularity=high': ('popularity', True),
+}
+DEFAULT_SORT = ('departure', False)
+
+
+def enabled():
+    return np is not None and getattr(settings, 'CATALOG_SNAPSHOT_ENGINE', False)
+
+
+class CatalogSnapshot:
+    """Column arrays over every tour, one row per TourSearchDocument."""
+
+    def __init__(self):
+        rows = list(TourSearchDocument.objects.values_list(
+            'tour_id', 'country_id', 'adventure_style_id', 'shadow_price', 'savings',
+            'popularity', 'no_of_reviews', 'nights', 'departure_date',
+            'start_city', 'end_city', 'destination_ids',
+        ))
+        self.country_ids = set(Country.objects.values_list('id', flat=True))
+
+        # Destination id → bit position; city name → destination ids
+        self.destination_bits = {}
+        self.city_destinations = {}
+        for destination_id, city in Destination.objects.values_list('id', 'city'):
+            self.destination_bits[destination_id] = len(self.destination_bits)
+            self.city_destinations.setdefault(city.lower(), []).append(destination_id)
+
+        self.city_codes = {}
+        count = len(rows)
+        words = max(1, (len(self.destination_bits) + 63) // 64)
+
+        self.tour_id = np.empty(count, dtype=np.int64)
+        self.country = np.empty(count, dtype=np.int64)
+        self.style = np.empty(count, dtype=np.int64)
+        self.price = np.empty(count, dtype=np.float64)
+        self.savings = np.empty(count, dtype=np.float64)
+        self.popularity = np.empty(count, dtype=np.float64)
+        self.reviews = np.empty(count, dtype=np.int64)
+        self.nights = np.empty(count, dtype=np.int32)
+        self.departure = np.empty(count, dtype=np.int32)
+        self.start_city = np.empty(count, dtype=np.int32)
+        self.end_city = np.empty(count, dtype=np.int32)
+        self.destinations = np.zeros((count, words), dtype=np.uint64)
+
+        for row, (tour_id, country_id, style_id, price, savings, popularity, reviews,
+                  nights, departure_date, start_city, end_city, destination_ids) in enumerate(rows):
+            self.tour_id[row] = tour_id
+            self.country[row] = country_id
+            self.style[row] = style_id
+            self.price[row] = np.nan if price is None else float(price)
+            self.savings[row] = np.nan if savings is None else savings
+            self.popularity[row] = popularity
+            self.reviews[row] = reviews
+            self.nights[row] = nights
+            self.departure[row] = departure_date.toordinal()
+            self.start_city[row] = self._city_code(start_city)
+            self.end_city[row] = self._city_code(end_city)
+            for destination_id in filter(None, destination_ids.split(',')):
+                bit = self.destination_bits.get(int(destination_id))
+                if bit is not None:
+                    self.destinations[row, bit // 64] |= np.uint64(1 << (bit % 64))
+
+    def _city_code(self, city):
+        return self.city_codes.setdefault(city, len(self.city_codes))
+
+    def _destination_mask(self, destination_ids):
+        """Rows whose bitset shares a bit with any of `destination_ids`."""
+        query = np.zeros(self.destinations.shape[1], dtype=np.uint64)
+        for destination_id in destination_ids:
+            bit = self.destination_bits.get(destination_id)
+            if bit is not None:
+                query[bit // 64] |= np.uint64(1 << (bit % 64))
+        return (self.destinations & query).any(axis=1)
+
+    def has_country(self, country_id):
+        return country_id in self.country_ids
+
+    def query(self, country_id, params):
+        """
+        Tour ids for CountryToursListView – same filters as
+        views.filter_tour_documents() and the same ?filter= sort modes,
+        ties broken on tour id.
+        """
+        mask = self.country == country_id
+
+        min_price = parse_decimal(params.get('min_price'))
+        if min_price is not None:
+            mask &= self.price >= float(min_price)  # NaN never matches, like NULL
+
+        max_price = parse_decimal(params.get('max_price'))
+        if max_price is not None:
+            mask &= self.price <= float(max_price)
+
+        city_id = params.get('city_id')
+        if city_id:
+            # The ORM matches the text ",<city_id>,", so only a plain id matches anything
+            destination_id = parse_int(city_id)
+            mask &= self._destination_mask([destination_id] if str(destination_id) == city_id else [])
+
+        city_name = params.get('city_name')
+        if city_name:
+            needle = city_name.lower()
+            matching = [
+                destination_id
+                for city, destination_ids in self.city_destinations.items() if needle in city
+                for destination_id in destination_ids
+            ]
+            mask &= self._destination_mask(matching)
+
+        window = departure_range(params)
+        if window:
+            start, end = window
+            if start:
+                mask &= self.departure >= start.toordinal()
+            if end:
+                mask &= self.departure < end.toordinal()
+
+        style_ids = [parse_int(aid) for aid in params.getlist('adventure_style') if parse_int(aid) is not None]
+        if style_ids:
+            mask &= np.isin(self.style, style_ids)
+
+        for param, column in (('start_city', self.start_city), ('end_city', self.end_city)):
+            value = params.get(param)
+            if value:
+                code = self.city_codes.get(value)
+                mask &= column == (-1 if code is None else code)
+
+        rows = np.flatnonzero(mask)
+        column, descending = SORT_MODES.get(params.get('filter'), DEFAULT_SORT)
+        keys = getattr(self, column)[rows].astype(np.float64)
+        keys[np.isnan(keys)] = -np.inf  # NULLs sort as the smallest value
+        ids = self.tour_id[rows]
+        if descending:
+            order = np.lexsort((-ids, -keys))
+        else:
+            order = np.lexsort((ids, keys))
+        return ids[order].tolist()
+
+
+snapshot_cache = ProcessCache(CatalogSnapshot)
+
+
+def get_snapshot():
+    """The current worker's snapshot, rebuilt if the catalog changed."""
+    return snapshot_cache.get()
@@ -26,11 +26,14 @@
             return;
         }
 
-        // Function to load cities
+        // Destinations autocomplete (checkboxes_destinations.js)
+        function selectedDestinationIds() {
+            return $('#id_destinations').val() || [];
+        }
+
+        // Function to load cities (served from the country's cached destination list)
         function loadCities(fieldName, container) {
-            var destIds = $('input[name="destinations"]:checked').map(function() {
-                return $(this).val();
-            }).get();
+            var destIds = selectedDestinationIds();
 
             if (destIds.length === 0) {
                 container.empty();
@@ -43,15 +46,11 @@
             $.ajax({
                 url: CITIES_URL,
                 method: 'GET',
-                data: { dest_ids: destIds, field_name: fieldName },
+                data: { dest_ids: destIds, country_id: $('#id_country').val() },
                 dataType: 'json',
                 traditional: true,
                 success: function(data) {
-                    container.html(data.html);
-                    // Re-check previous if still available
-                    if (currentSelected) {
-                        container.find('input[value="' + currentSelected + '"]').prop('checked', true);
-                    }
+                    container.empty().append(buildCheckboxes(fieldName, data.cities, currentSelected));
                 },
                 error: function(xhr, status, err) {
                     console.error('AJAX error:', status, err);
@@ -61,6 +60,22 @@
             });
         }
 
+        // Same markup as Django's CheckboxSelectMultiple; re-checks the previous choice if still available
+        function buildCheckboxes(fieldName, cities, currentSelected) {
+            return $.map(cities, function(city, i) {
+                var inputId = 'id_' + fieldName + '_' + i;
+                var input = $('<input>', {
+                    type: 'checkbox',
+                    name: fieldName,
+                    value: city,
+                    id: inputId,
+                    'class': 'cities-checkboxes'
+                }).prop('checked', city === currentSelected);
+                var label = $('<label>', {'for': inputId}).append(input, ' ', document.createTextNode(city));
+                return $('<div>').append(label)[0];
+            });
+        }
+
         // Enforce single selection per group
         function enforceSingleSelection(container, fieldName) {
             container.off('change', 'input[type="checkbox"]').on('change', 'input[type="checkbox"]', function() {
@@ -75,8 +90,7 @@
         enforceSingleSelection($endContainer, 'end_city');
 
         // Load initial if edit (destinations may be pre-checked)
-        var initialDestIds = $('input[name="destinations"]:checked').map(function(){return $(this).val();}).get();
-        if (initialDestIds.length > 0) {
+        if (selectedDestinationIds().length > 0) {
             loadCities('start_city', $startContainer);
             loadCities('end_city', $endContainer);
         } else {
@@ -87,15 +101,7 @@
             $endContainer.html('<li style="margin: 10px; padding: 5px; border: 1px solid #ccc; background: #f9f9f9;"><p>Select destinations to see end cities.</p></li>');
         }
 
-        // Listen for destinations change
-        $(document).on('change', 'input[name="destinations"]', function() {
-            setTimeout(function() {
-                loadCities('start_city', $startContainer);
-                loadCities('end_city', $endContainer);
-            }, 50);
-        });
-
-        // Also listen to custom event from destinations JS
+        // Listen to the custom event from destinations JS
         $(document).on('destinationsChanged', function() {
             setTimeout(function() {
                 loadCities('start_city', $startContainer);
@@ -106,7 +112,7 @@
         // Country change: if no destinations, clear cities
         $('#id_country').on('change', function() {
             setTimeout(function() {
-                if (!$('input[name="destinations"]:checked').length) {
+                if (!selectedDestinationIds().length) {
                     $startContainer.empty();
                     $startContainer.html('<li style="margin: 10px; padding: 5px; border: 1px solid #ccc; background: #f9f9f9;"><p>Select country and destinations first.</p></li>');
                     $endContainer.empty();
@@ -0,0 +1,73 @@
+# toursntrips/storage.py
+"""
+Content-addressed storage for tour images.
+
+Uploads are saved as <upload dir>/<sha256 of the bytes>[:32].<ext>, so a
+media URL always means the same bytes: re-uploading a changed image gives
+a new URL instead of changing what an old one returns. That makes the
+files safe to cache forever – serve_media() (and nginx in production,
+matching the same names) sends
+
+    Cache-Control: public, max-age=31536000, immutable
+
+for hashed names. Files uploaded before this storage keep their names and
+their default caching.
+
+Identical uploads share one file: when the hashed name already exists the
+upload isn't written again. Rows can therefore share a file, so never
+delete a tour image file without checking other rows (see
+`manage.py dedupe_tour_images`, which merges pre-existing duplicates).
+"""
+import hashlib
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.views.static import serve
+
+HASH_LENGTH = 32
+HASHED_NAME = re.compile(rf'(^|/)[0-9a-f]{{{HASH_LENGTH}}}\.[A-Za-z0-9]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def content_hash(content):
+    """Hex sha256 of a File's bytes, truncated to HASH_LENGTH."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+class ContentHashStorage(FileSystemStorage):
+    """FileSystemStorage that names every saved file after its content hash, stored once."""
+
+    def hashed_name(self, name, content):
+        """'tours/india-banner-4.PNG' → 'tours/3f9a…c2.png'"""
+        directory = posixpath.dirname(name)
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(directory, f'{content_hash(content)}{extension}')
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            return name  # same bytes are already stored – reuse the blob
+        return super().save(name, content, max_length)
+
+
+def tour_image_storage():
+    # Callable so the field (and its migrations) don't pin a storage instance
+    return ContentHashStorage()
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """django.views.static.serve, plus far-future caching for hashed names."""
+    response = serve(request, path, document_root=document_root, show_indexes=show_indexes)
+    if HASHED_NAME.search(path) and response.status_code in (200, 304):
+        response['Cache-Control'] = IMMUTABLE
+    return response
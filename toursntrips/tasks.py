@@ -0,0 +1,19 @@
+# toursntrips/tasks.py
+import logging
+from celery import shared_task
+
+from .images import process_tour_image
+
+logger = logging.getLogger(__name__)  # Logs to Celery worker console
+
+
+@shared_task(bind=True, max_retries=3)
+def generate_tour_image_variants(self, tour_id):
+    """WebP derivatives and metadata for a freshly uploaded tour image (see images.py)."""
+    try:
+        if process_tour_image(tour_id):
+            logger.info(f"[{self.request.id}] Image processed for tour {tour_id}")
+    except OSError as exc:
+        # Unreadable / half-written file or storage hiccup – try again shortly
+        logger.warning(f"[{self.request.id}] Image processing failed for tour {tour_id}: {exc}")
+        raise self.retry(exc=exc, countdown=30)
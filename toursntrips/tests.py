@@ -1,3 +1,1416 @@
-from django.test import TestCase
+import base64
+import csv
+import hashlib
+import json
+import os
+import tempfile
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import Http404, QueryDict
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIRequestFactory
+
+from . import autocomplete, catalog_io, search, snapshot
+from .admin import TournTripsAdmin
+from .bulk import BulkTourUpdateCommand
+from .cache import GLOBAL, ProcessCache, bump_catalog_version, country_scope, get_catalog_version
+from .dates import departure_range, month_range, parse_date, parse_decimal
+from .images import process_tour_image
+from .models import Continent, Country, AdventureStyle, Destination, TournTrips, TourSearchDocument, unique_slug
+from .storage import IMMUTABLE, serve_media
+from .tasks import generate_tour_image_variants
+from .views import MAX_BATCH_TOURS, CountryToursListView
+
+
+class CatalogTestMixin:
+    """Builds a small catalog: one country, a few destinations and styles."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        continent = Continent.objects.create(name='Asia', code='AS')
+        self.country = Country.objects.create(name='India', code='IND', continent=continent)
+        self.style = AdventureStyle.objects.create(name='Hiking')
+        self.destinations = [
+            Destination.objects.create(name=f'Destination {i}', country=self.country, city=f'City {i}')
+            for i in range(3)
+        ]
+
+    def create_tours(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self._create_tours(count)
+
+    def _create_tours(self, count):
+        tours = []
+        for i in range(count):
+            tour = TournTrips.objects.create(
+                title=f'Tour {i}',
+                country=self.country,
+                _days=5,
+                _nights=4,
+                rating=Decimal('4.5'),
+                no_of_reviews=10 + i,
+                shadow_price=Decimal('100.00') + i,
+                discount_percentage=Decimal('10.00'),
+                departure_date=date(2026, 11, 1 + i % 28),
+                adventure_styles=self.style,
+                start_city='City 0',
+                end_city='City 1',
+            )
+            tour.destinations.set(self.destinations)
+            tours.append(tour)
+        return tours
+
+
+class TourDestinationsQueryCountTests(CatalogTestMixin, TestCase):
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'page_size': 100})
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def test_country_tours_query_count_is_constant(self):
+        url = f'/tourntrips/countries/{self.country.id}/tours/'
+        self.create_tours(2)
+        few, _ = self.count_queries(url)
+        self.create_tours(20)
+        many, data = self.count_queries(url)
+
+        self.assertEqual(few, many)
+        self.assertEqual(len(data['results']), 22)
+        self.assertEqual(data['results'][0]['destinations'], [d.name for d in self.destinations])
+
+    def test_tour_detail_destinations(self):
+        tour = self.create_tours(1)[0]
+        response = self.client.get(f'/tourntrips/tours/{tour.id}/')
+        self.assertEqual(response.json()['destinations'], [d.name for d in self.destinations])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite syntax')
+class TourSortIndexTests(CatalogTestMixin, TestCase):
+    """Every sort mode is an index range scan – no temp B-tree sort."""
+
+    SORT_MODES = [
+        None, 'price=low', 'price=high', 'duration=short', 'duration=long',
+        'reviews=most', 'discount=high', 'popularity=high',
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.create_tours(5)
+
+    def query_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return ' / '.join(row[-1] for row in cursor.fetchall())
+
+    def assertIndexScan(self, queryset):
+        plan = self.query_plan(queryset)
+        self.assertIn('INDEX', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_country_tours_sort_modes(self):
+        for mode in self.SORT_MODES:
+            with self.subTest(filter=mode):
+                request = APIRequestFactory().get('/', {'filter': mode} if mode else {})
+                view = CountryToursListView()
+                view.setup(view.initialize_request(request), country_id=self.country.id)
+                self.assertIndexScan(view.get_queryset()[:10])
+
+    def test_generated_columns(self):
+        tour = TournTrips.objects.get(title='Tour 2')
+        self.assertEqual(tour.final_price, Decimal('91.80'))
+        self.assertAlmostEqual(tour.savings, 10.2)
+        self.assertAlmostEqual(tour.popularity, 54.0)
+        self.assertEqual(tour.search_document.final_price, tour.final_price)
+
+
+class TourAdminChangelistQueryCountTests(CatalogTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/admin/toursntrips/tourntrips/')
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def test_changelist_query_count_is_constant(self):
+        self.create_tours(2)
+        few, _ = self.count_queries()
+        self.create_tours(20)
+        many, response = self.count_queries()
+
+        self.assertEqual(few, many)
+        self.assertContains(response, 'Destination 0, Destination 1, Destination 2', count=22)
+
+
+class KeysetPaginationTests(CatalogTestMixin, TestCase):
+    """?pagination=cursor walks the same order as page numbers, both ways."""
+
+    def setUp(self):
+        super().setUp()
+        tours = self.create_tours(7)
+        # Tours without a price: NULL shadow_price / final_price / savings
+        with self.captureOnCommitCallbacks(execute=True):
+            for tour in tours[1:3]:
+                tour.shadow_price = None
+                tour.save()
+        self.url = f'/tourntrips/countries/{self.country.id}/tours/'
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [tour['id'] for tour in response.json()['results']]
+
+    def expected_ids(self, mode):
+        params = {'page_size': 100}
+        if mode:
+            params['filter'] = mode
+        return self.ids(self.client.get(self.url, params))
+
+    def walk(self, url, params, link):
+        pages = []
+        while url:
+            response = self.client.get(url, params)
+            pages.append(self.ids(response))
+            url, params = response.json()[link], None
+        return pages
+
+    def test_next_and_previous_cover_every_sort_mode(self):
+        for mode in TourSortIndexTests.SORT_MODES:
+            with self.subTest(filter=mode):
+                params = {'pagination': 'cursor', 'page_size': 2}
+                if mode:
+                    params['filter'] = mode
+                expected = self.expected_ids(mode)
+
+                forward = self.walk(self.url, params, 'next')
+                self.assertEqual([tour_id for page in forward for tour_id in page], expected)
+                self.assertEqual([len(page) for page in forward], [2, 2, 2, 1])
+
+                # Back from the last page via `previous`
+                last = self.client.get(self.url, params)
+                while last.json()['next']:
+                    last = self.client.get(last.json()['next'])
+                backward = self.walk(last.json()['previous'], None, 'previous')
+                self.assertEqual(backward, forward[-2::-1])
+
+    def test_null_prices_sort_as_smallest(self):
+        null_ids = list(TournTrips.objects.filter(shadow_price__isnull=True).order_by('id').values_list('id', flat=True))
+        self.assertEqual(self.expected_ids('price=low')[:2], null_ids)
+        self.assertEqual(self.expected_ids('price=high')[-2:], null_ids[::-1])
+
+    def test_malformed_cursor_is_404(self):
+        for cursor in ['not-base64!', 'eyJmb28iOjF9', 'eyJyIjowLCJwIjpbMV19']:  # garbage, no keys, short position
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url, {'pagination': 'cursor', 'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+    def test_tampered_cursor_values_are_404(self):
+        for sort, position in [
+            ('price=high', ['abc', 5]),
+            ('', ['2026-13-45', 5]),
+            ('', [{'a': 1}, 5]),
+            ('reviews=most', [3, 'x']),
+        ]:
+            with self.subTest(sort=sort, position=position):
+                payload = json.dumps({'r': 0, 'p': position})
+                cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+                response = self.client.get(self.url, {'pagination': 'cursor', 'filter': sort, 'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class TourSearchDocumentSyncTests(CatalogTestMixin, TestCase):
+    """The denormalized document follows its tour, destinations and deletes."""
+
+    def setUp(self):
+        super().setUp()
+        self.tour = self.create_tours(1)[0]
+
+    def document(self):
+        return TourSearchDocument.objects.get(tour=self.tour)
+
+    def test_document_copies_the_tour(self):
+        document = self.document()
+        self.assertEqual(document.country_id, self.country.id)
+        self.assertEqual(document.shadow_price, self.tour.shadow_price)
+        self.assertEqual(document.nights, 4)
+        self.assertEqual(document.destination_ids, ''.join(f',{d.id}' for d in self.destinations) + ',')
+        self.assertEqual(document.destination_cities, '|City 0|City 1|City 2|')
+
+    def test_tour_save_updates_the_document(self):
+        self.tour.shadow_price = Decimal('250.00')
+        self.tour.save()
+        document = self.document()
+        self.assertEqual(document.shadow_price, Decimal('250.00'))
+        self.assertEqual(document.final_price, Decimal('225.00'))
+
+    def test_destination_changes_update_the_document(self):
+        self.tour.destinations.remove(self.destinations[0])
+        self.assertEqual(self.document().destination_cities, '|City 1|City 2|')
+
+        self.destinations[1].city = 'Renamed'
+        self.destinations[1].save()
+        self.assertEqual(self.document().destination_cities, '|Renamed|City 2|')
+
+        self.destinations[2].delete()
+        self.assertEqual(self.document().destination_ids, f',{self.destinations[1].id},')
+
+    def test_tour_delete_removes_the_document(self):
+        self.tour.delete()
+        self.assertFalse(TourSearchDocument.objects.exists())
+
+
+class ConditionalGetTests(CatalogTestMixin, TestCase):
+    """ETag / Last-Modified: a matching validator gets a 304 until the catalog changes."""
+
+    def setUp(self):
+        super().setUp()
+        self.tour = self.create_tours(2)[0]
+        self.urls = [
+            f'/tourntrips/countries/{self.country.id}/tours/',
+            f'/tourntrips/tours/{self.tour.id}/',
+        ]
+
+    def test_matching_etag_is_304(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.has_header('Last-Modified'))
+                revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(revalidated.status_code, 304)
+                self.assertEqual(revalidated['ETag'], response['ETag'])
+
+    def test_last_modified_is_304(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                revalidated = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(revalidated.status_code, 304)
+
+    def test_catalog_change_moves_the_etag(self):
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.destinations[0].name = 'Renamed'
+            self.destinations[0].save()
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_query_params_are_part_of_the_etag(self):
+        url = self.urls[0]
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, {'filter': 'price=high'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class AutocompleteTests(CatalogTestMixin, TestCase):
+    """Prefix lookup over countries, cities and destinations."""
+
+    def setUp(self):
+        super().setUp()
+        autocomplete.index_cache.clear()  # versions restart with the cleared cache
+        Country.objects.create(name='United States', code='USA', continent=self.country.continent)
+        Destination.objects.create(name='Côte Sauvage', country=self.country, city='Indore')
+
+    def lookup(self, q, **params):
+        response = self.client.get('/tourntrips/autocomplete/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(entry['type'], entry['label']) for entry in response.json()['results']]
+
+    def test_prefix_of_any_word(self):
+        self.assertEqual(self.lookup('unit'), [('country', 'United States')])
+        self.assertEqual(self.lookup('stat'), [('country', 'United States')])
+        self.assertEqual(self.lookup('usa'), [('country', 'United States')])
+        self.assertEqual(self.lookup('xyz'), [])
+        self.assertEqual(self.lookup('  '), [])
+
+    def test_accents_and_case_are_ignored(self):
+        self.assertEqual(self.lookup('COTE s'), [('destination', 'Côte Sauvage')])
+        self.assertEqual(self.lookup('sauv'), [('destination', 'Côte Sauvage')])
+
+    def test_countries_then_cities_then_destinations(self):
+        self.assertEqual(self.lookup('ind'), [('country', 'India'), ('city', 'Indore')])
+        self.assertEqual(
+            self.lookup('ci'),
+            [('city', 'City 0'), ('city', 'City 1'), ('city', 'City 2')],
+        )
+        self.assertEqual(self.lookup('dest', limit=2), [('destination', 'Destination 0'), ('destination', 'Destination 1')])
+
+    def test_whole_label_prefixes_rank_first(self):
+        Destination.objects.create(name='Old Indus Fort', country=self.country, city='Leh')
+        Destination.objects.create(name='Indus Valley', country=self.country, city='Leh')
+        self.assertEqual(
+            [label for entry_type, label in self.lookup('indus') if entry_type == 'destination'],
+            ['Indus Valley', 'Old Indus Fort'],
+        )
+
+    def test_index_follows_catalog_changes(self):
+        self.assertEqual(self.lookup('zanz'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            Destination.objects.create(name='Zanzibar', country=self.country, city='Stone Town')
+        self.assertEqual(self.lookup('zanz'), [('destination', 'Zanzibar')])
+
+    def test_bad_limit_is_400(self):
+        response = self.client.get('/tourntrips/autocomplete/', {'q': 'ind', 'limit': 'ten'})
+        self.assertEqual(response.status_code, 400)
+
+
+class DepartureRangeTests(SimpleTestCase):
+    """dates.py: every date filter becomes one half-open [start, end) window."""
+
+    today = date(2026, 10, 18)
+
+    def window(self, query):
+        return departure_range(QueryDict(query), today=self.today)
+
+    def test_parse_date(self):
+        self.assertEqual(parse_date('2026-11-05'), date(2026, 11, 5))
+        for value in [None, '', '2026-13-01', '05/11/2026', 'soon']:
+            with self.subTest(value=value):
+                self.assertIsNone(parse_date(value))
+
+    def test_parse_decimal(self):
+        self.assertEqual(parse_decimal('99.50'), Decimal('99.50'))
+        self.assertEqual(parse_decimal('0'), Decimal('0'))
+        for value in [None, '', 'abc', '1,000', 'NaN', 'Infinity', '-inf']:
+            with self.subTest(value=value):
+                self.assertIsNone(parse_decimal(value))
+
+    def test_month_range(self):
+        self.assertEqual(month_range(10, today=self.today), (date(2026, 10, 1), date(2026, 11, 1)))  # current month counts
+        self.assertEqual(month_range(3, today=self.today), (date(2027, 3, 1), date(2027, 4, 1)))     # next March
+        self.assertEqual(month_range(12, 2026), (date(2026, 12, 1), date(2027, 1, 1)))
+        with patch('django.utils.timezone.localdate', return_value=date(2030, 10, 18)):
+            self.assertEqual(month_range(9), (date(2031, 9, 1), date(2031, 10, 1)))
+
+    def test_single_filters(self):
+        self.assertIsNone(self.window(''))
+        self.assertEqual(self.window('departure_date=2026-11-05'), (date(2026, 11, 5), date(2026, 11, 6)))
+        self.assertEqual(self.window('month=2&year=2028'), (date(2028, 2, 1), date(2028, 3, 1)))
+        self.assertEqual(self.window('date_from=2026-11-01&date_to=2026-11-15'), (date(2026, 11, 1), date(2026, 11, 16)))
+        self.assertEqual(self.window('date_from=2026-11-01'), (date(2026, 11, 1), None))
+        self.assertEqual(self.window('date_to=2026-11-15'), (None, date(2026, 11, 16)))
+
+    def test_filters_intersect(self):
+        self.assertEqual(
+            self.window('month=11&date_from=2026-11-10&date_to=2026-12-31'),
+            (date(2026, 11, 10), date(2026, 12, 1)),
+        )
+
+    def test_invalid_values_are_ignored(self):
+        for query in ['month=13', 'month=nov', 'month=²', 'departure_date=tomorrow', 'date_from=2026-02-30', 'month=5&year=0']:
+            with self.subTest(query=query):
+                window = self.window(query)
+                if query.startswith('month=5'):
+                    self.assertEqual(window, (date(2027, 5, 1), date(2027, 6, 1)))  # bad year → next May
+                else:
+                    self.assertIsNone(window)
+
+    def test_date_max_does_not_overflow(self):
+        self.assertIsNone(self.window('departure_date=9999-12-31'))
+        self.assertEqual(self.window('date_to=9999-12-31'), (None, None))
+        self.assertEqual(self.window('month=12&year=9999'), (date(2026, 12, 1), date(2027, 1, 1)))  # year ignored
+
+
+class TourListDateFilterTests(CatalogTestMixin, TestCase):
+
+    def test_month_and_range_filters(self):
+        self.create_tours(10)  # departing 2026-11-01 … 2026-11-10
+        url = f'/tourntrips/countries/{self.country.id}/tours/'
+
+        def titles(**params):
+            results = self.client.get(url, {'page_size': 100, **params}).json()['results']
+            return sorted(tour['title'] for tour in results)
+
+        self.assertEqual(len(titles(month=11, year=2026)), 10)
+        self.assertEqual(titles(month=12, year=2026), [])
+        self.assertEqual(titles(date_from='2026-11-03', date_to='2026-11-04'), ['Tour 2', 'Tour 3'])
+        self.assertEqual(titles(departure_date='2026-11-10'), ['Tour 9'])
+        self.assertEqual(len(titles(month='²', year='²')), 10)  # ignored, not a 500
+
+
+class CatalogTreeTests(CatalogTestMixin, TestCase):
+    url = '/tourntrips/catalog-tree/'
+
+    def test_shape_and_aggregates(self):
+        tours = self.create_tours(3)
+        for tour, departure in zip(tours, [date(2000, 1, 1), date(2099, 1, 3), date(2099, 1, 2)]):
+            TournTrips.objects.filter(pk=tour.pk).update(departure_date=departure)
+        empty = Country.objects.create(name='Nepal', code='NPL', continent=self.country.continent)
+        Continent.objects.create(name='Europe', code='EU')
+
+        with self.assertNumQueries(2):
+            data = self.client.get(self.url).json()
+
+        self.assertEqual([continent['name'] for continent in data], ['Asia', 'Europe'])
+        asia, europe = data
+        self.assertEqual(set(asia), {'id', 'name', 'code', 'slug', 'countries'})
+        self.assertEqual(europe['countries'], [])
+        self.assertEqual([country['name'] for country in asia['countries']], ['India', 'Nepal'])
+
+        india, nepal = asia['countries']
+        self.assertEqual(set(india), {'id', 'name', 'code', 'slug', 'tour_count', 'min_price', 'next_departure'})
+        self.assertEqual(india['tour_count'], 3)
+        self.assertEqual(
+            Decimal(str(india['min_price'])),
+            min(TournTrips.objects.values_list('final_price', flat=True)),
+        )
+        self.assertEqual(india['next_departure'], '2099-01-02')  # Tour 0 already left
+        self.assertEqual(nepal, {
+            'id': empty.id, 'name': 'Nepal', 'code': 'NPL', 'slug': empty.slug,
+            'tour_count': 0, 'min_price': None, 'next_departure': None,
+        })
+
+    def test_next_departure_uses_the_local_date(self):
+        tours = self.create_tours(2)
+        for tour, departure in zip(tours, [date(2099, 1, 1), date(2099, 1, 2)]):
+            TournTrips.objects.filter(pk=tour.pk).update(departure_date=departure)
+        with patch('django.utils.timezone.localdate', return_value=date(2099, 1, 2)):
+            india = self.client.get(self.url).json()[0]['countries'][0]
+        self.assertEqual(india['next_departure'], '2099-01-02')
+
+    def test_cached_until_the_catalog_changes(self):
+        self.create_tours(1)
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Country.objects.create(name='Japan', code='JPN', continent=self.country.continent)
+        names = [country['name'] for country in self.client.get(self.url).json()[0]['countries']]
+        self.assertEqual(names, ['India', 'Japan'])
+
+
+class DestinationCacheInvalidationTests(CatalogTestMixin, TestCase):
+
+    def cities(self, country):
+        response = self.client.get(f'/tourntrips/countries/{country.id}/cities/')
+        return [row['city'] for row in response.json()]
+
+    def test_cache_hit_then_invalidated_on_save_and_delete(self):
+        self.assertEqual(self.cities(self.country), ['City 0', 'City 1', 'City 2'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cities(self.country), ['City 0', 'City 1', 'City 2'])
+
+        destination = self.destinations[0]
+        destination.city = 'City 9'
+        with self.captureOnCommitCallbacks(execute=True):
+            destination.save()
+        self.assertEqual(self.cities(self.country), ['City 1', 'City 2', 'City 9'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            destination.delete()
+        self.assertEqual(self.cities(self.country), ['City 1', 'City 2'])
+
+    def test_moving_to_another_country_invalidates_both(self):
+        nepal = Country.objects.create(name='Nepal', code='NPL', continent=self.country.continent)
+        self.assertEqual(self.cities(self.country), ['City 0', 'City 1', 'City 2'])
+        self.assertEqual(self.cities(nepal), [])
+
+        destination = self.destinations[2]
+        destination.country = nepal
+        with self.captureOnCommitCallbacks(execute=True):
+            destination.save()
+
+        self.assertEqual(self.cities(self.country), ['City 0', 'City 1'])
+        self.assertEqual(self.cities(nepal), ['City 2'])
+
+
+@skipUnless(search.fts_enabled(), 'FTS5 search needs SQLite')
+class ProcessCacheTests(SimpleTestCase):
+
+    def test_built_once_per_version(self):
+        builds = []
+        cached = ProcessCache(lambda: builds.append(1) or len(builds), GLOBAL)
+        self.assertEqual([cached.get(), cached.get()], [1, 1])
+        bump_catalog_version(country_scope(1))  # another scope
+        self.assertEqual(cached.get(), 1)
+        bump_catalog_version(GLOBAL)
+        self.assertEqual([cached.get(), cached.get()], [2, 2])
+        cached.clear()
+        self.assertEqual(cached.get(), 3)
+
+
+class TourSearchTests(CatalogTestMixin, TestCase):
+    url = '/tourntrips/search/'
+
+    def search(self, q, **params):
+        response = self.client.get(self.url, {'q': q, 'page_size': 100, **params})
+        self.assertEqual(response.status_code, 200)
+        return [tour['title'] for tour in response.json()['results']]
+
+    def rename(self, tour, title):
+        tour.title = title
+        with self.captureOnCommitCallbacks(execute=True):
+            tour.save()
+
+    def test_ranking_prefix_and_all_words(self):
+        tours = self.create_tours(3)
+        self.rename(tours[0], 'Glacier walk')
+        self.rename(tours[1], 'Valley trek')
+        destination = self.destinations[0]
+        destination.description = 'Blue glacier views'
+        with self.captureOnCommitCallbacks(execute=True):
+            destination.save()
+
+        # A title match (weight 10) outranks a destination description (weight 5)
+        self.assertEqual(self.search('glacier')[0], 'Glacier walk')
+        self.assertEqual(len(self.search('glacier')), 3)
+        self.assertEqual(self.search('glac wal'), ['Glacier walk'])
+        self.assertEqual(self.search('VALLEY'), ['Valley trek'])
+        self.assertEqual(self.search('valley glacier'), ['Valley trek'])  # every word must match
+
+    def test_syntax_characters_are_not_operators(self):
+        self.create_tours(2)
+        for q in ['"', '"Tour', 'Tour"', 'AND OR *', 'NEAR(Tour)', 'Tour -0', 'Tour:1', '(', '^', '²']:
+            with self.subTest(q=q):
+                self.search(q)
+        self.assertEqual(self.search(''), [])
+        self.assertEqual(self.search('AND OR *'), [])            # plain words, not operators
+        self.assertEqual(self.search('"Tour 1"'), ['Tour 1', 'Tour 0'])  # Tour 0 via "Destination 1"
+        self.assertEqual(self.search('tour OR 0'), [])            # "or" must match too
+
+    def test_country_filter(self):
+        self.create_tours(2)
+        nepal = Country.objects.create(name='Nepal', code='NPL', continent=self.country.continent)
+        self.assertEqual(len(self.search('tour', country_id=self.country.id)), 2)
+        self.assertEqual(self.search('tour', country_id=nepal.id), [])
+        self.assertEqual(len(self.search('tour', country_id='²')), 2)  # ignored
+        self.assertEqual(len(self.search('india')), 2)
+        self.assertEqual(len(self.search('ind')), 2)  # country code / name
+
+    def test_index_follows_tour_save_and_delete(self):
+        tours = self.create_tours(2)
+        self.rename(tours[0], 'Everest base camp')
+        self.assertEqual(self.search('everest'), ['Everest base camp'])
+        self.assertEqual(self.search('tour'), ['Tour 1'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tours[0].delete()
+        self.assertEqual(self.search('everest'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tours[1].destinations.remove(self.destinations[2])
+        self.assertEqual(self.search('destination 2'), [])
+        self.assertEqual(self.search('destination 1'), ['Tour 1'])
+
+
+class TourFacetsTests(CatalogTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.rafting = AdventureStyle.objects.create(name='Rafting')
+        tours = self.create_tours(6)  # shadow_price 100…105, departing 2026-11-01…06
+        # Tours 0-3 hiking, 4-5 rafting; tours 0, 1 and 4 start in City 2
+        with self.captureOnCommitCallbacks(execute=True):
+            for tour in tours[4:]:
+                tour.adventure_styles = self.rafting
+                tour.save()
+            for tour in (tours[0], tours[1], tours[4]):
+                tour.start_city = 'City 2'
+                tour.save()
+            tours[5].shadow_price = 800
+            tours[5].departure_date = date(2026, 12, 1)
+            tours[5].save()
+
+    def facets(self, **params):
+        response = self.client.get(f'/tourntrips/countries/{self.country.id}/tours/facets/', params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return {
+            'count': data['count'],
+            'styles': {row['name']: row['count'] for row in data['adventure_styles']},
+            'cities': {row['city']: row['count'] for row in data['start_cities']},
+            'prices': [row['count'] for row in data['price']][:2],
+            'months': {row['month']: row['count'] for row in data['departure_months']},
+            'nights': sum(row['count'] for row in data['nights']),
+        }
+
+    def test_unfiltered(self):
+        self.assertEqual(self.facets(), {
+            'count': 6,
+            'styles': {'Hiking': 4, 'Rafting': 2},
+            'cities': {'City 0': 3, 'City 2': 3},
+            'prices': [5, 1],
+            'months': {'2026-11': 5, '2026-12': 1},
+            'nights': 6,
+        })
+
+    def test_each_facet_ignores_its_own_filter(self):
+        facets = self.facets(adventure_style=self.style.id, start_city='City 2')
+        self.assertEqual(facets['count'], 2)                                # tours 0 and 1
+        self.assertEqual(facets['styles'], {'Hiking': 2, 'Rafting': 1})     # start_city only
+        self.assertEqual(facets['cities'], {'City 0': 2, 'City 2': 2})      # style only
+        self.assertEqual(facets['prices'], [2, 0])
+        self.assertEqual(facets['nights'], 2)                               # no own filter
+
+        facets = self.facets(adventure_style=self.rafting.id, max_price=500, month=12, year=2026)
+        self.assertEqual(facets['count'], 0)
+        self.assertEqual(facets['styles'], {})                              # no December tour under 500
+        self.assertEqual(facets['prices'], [0, 1])                          # rafting in December
+        self.assertEqual(facets['months'], {'2026-11': 1})                  # rafting under 500
+
+    def test_invalid_prices_are_ignored(self):
+        self.assertEqual(self.facets(min_price='abc', max_price='Infinity'), self.facets())
+        response = self.client.get(f'/tourntrips/countries/{self.country.id}/tours/', {'min_price': 'abc'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 6)
+
+    def test_one_query_per_selected_facet(self):
+        with self.assertNumQueries(3):  # country, documents, style names
+            self.facets(city_name='City')
+        with self.assertNumQueries(3 + 2):
+            self.facets(adventure_style=self.style.id, start_city='City 2')
+
+
+@skipUnless(snapshot.np is not None, 'the snapshot engine needs numpy')
+class SnapshotParityTests(CatalogTestMixin, TestCase):
+    """The in-memory snapshot returns exactly what the ORM path returns."""
+
+    def setUp(self):
+        super().setUp()
+        rafting = AdventureStyle.objects.create(name='Rafting')
+        self.styles = [self.style, rafting]
+        tours = self.create_tours(12)
+        with self.captureOnCommitCallbacks(execute=True):
+            for i, tour in enumerate(tours):
+                tour.shadow_price = None if i % 5 == 0 else Decimal(100 + 37 * i % 300)
+                tour.discount_percentage = Decimal(5 * (i % 4))
+                tour.no_of_reviews = 10 + 7 * i % 5        # ties
+                tour._nights = 2 + i % 4
+                tour._days = tour._nights + 1
+                tour.departure_date = date(2026, 11 + i % 2, 1 + i)
+                tour.adventure_styles = self.styles[i % 2]
+                tour.start_city = f'City {i % 3}'
+                tour.end_city = f'City {(i + 1) % 3}'
+                tour.save()
+                tour.destinations.set(self.destinations[:1 + i % 3])
+
+    def tour_ids(self, query, engine):
+        cache.clear()
+        snapshot.snapshot_cache.clear()
+        with self.settings(CATALOG_SNAPSHOT_ENGINE=engine):
+            response = self.client.get(f'/tourntrips/countries/{self.country.id}/tours/?page_size=100&{query}')
+        self.assertEqual(response.status_code, 200, query)
+        return [tour['id'] for tour in response.json()['results']]
+
+    def test_every_filter_and_sort_mode(self):
+        destination = self.destinations[2]
+        hiking, rafting = (style.id for style in self.styles)
+        queries = [
+            '',
+            'min_price=150', 'max_price=250', 'min_price=150&max_price=250',
+            'min_price=abc', 'max_price=NaN', 'min_price=1e999', 'max_price=1e999',
+            f'city_id={destination.id}', f'city_id=0{destination.id}', 'city_id=abc', 'city_id=99999',
+            'city_name=city 2', 'city_name=CITY', 'city_name=nowhere',
+            'month=12&year=2026', 'month=11', 'departure_date=2026-11-03',
+            'date_from=2026-11-03&date_to=2026-12-08', 'date_to=2026-11-05',
+            f'adventure_style={hiking}', f'adventure_style={hiking}&adventure_style={rafting}', 'adventure_style=²',
+            'start_city=City 1', 'end_city=City 2', 'end_city=Nowhere',
+            f'adventure_style={rafting}&start_city=City 0&min_price=100&city_id={self.destinations[1].id}',
+        ]
+        for query in queries:
+            for mode in TourSortIndexTests.SORT_MODES:
+                full_query = f'{query}&filter={mode}' if mode else query
+                with self.subTest(query=full_query):
+                    expected = self.tour_ids(full_query, engine=False)
+                    self.assertEqual(self.tour_ids(full_query, engine=True), expected)
+        self.assertEqual(self.tour_ids('city_id=abc', engine=True), [])
+
+
+class SlugTests(TestCase):
+
+    def setUp(self):
+        self.asia = Continent.objects.create(name='Asia', code='AS')
+
+    def test_collisions_get_a_numeric_suffix(self):
+        first = Country.objects.create(name='Costa Rica', code='CRI', continent=self.asia)
+        second = Country.objects.create(name='Costa  Rica!', code='CR2', continent=self.asia)
+        third = Country.objects.create(name='costa rica?', code='CR3', continent=self.asia)
+        self.assertEqual([first.slug, second.slug, third.slug], ['costa-rica', 'costa-rica-2', 'costa-rica-3'])
+        self.assertEqual(Continent.objects.create(name='!!!').slug, 'item')
+
+    def test_the_instance_does_not_collide_with_itself(self):
+        country = Country.objects.create(name='Costa Rica', code='CRI', continent=self.asia)
+        self.assertEqual(unique_slug(country, 'Costa Rica'), 'costa-rica')
+        self.assertEqual(unique_slug(Country(name='Costa Rica'), 'Costa Rica'), 'costa-rica-2')
+
+    def test_taken_set(self):
+        taken = {'peru', 'peru-2'}
+        self.assertEqual(unique_slug(Country(), 'Peru', taken), 'peru-3')
+        self.assertEqual(unique_slug(Country(), 'Peru', taken), 'peru-4')
+        self.assertEqual(unique_slug(Country(), 'Chile', taken), 'chile')
+        self.assertEqual(taken, {'peru', 'peru-2', 'peru-3', 'peru-4', 'chile'})
+        with self.assertNumQueries(0):
+            unique_slug(Country(), 'Peru', taken)
+
+    def test_rename_follows_the_name(self):
+        country = Country.objects.create(name='Burma', code='MMR', continent=self.asia)
+        country.name = 'Myanmar'
+        country.save()
+        self.asia.name = 'Asia Pacific'
+        self.asia.save()
+        country.refresh_from_db()
+        self.asia.refresh_from_db()
+        self.assertEqual((country.slug, self.asia.slug), ('myanmar', 'asia-pacific'))
+        self.assertEqual(self.client.get('/tourntrips/countries/myanmar/').json()['name'], 'Myanmar')
+        self.assertEqual(self.client.get('/tourntrips/countries/burma/').status_code, 404)
+
+    def test_unchanged_name_keeps_a_suffixed_slug(self):
+        Country.objects.create(name='Costa Rica', code='CRI', continent=self.asia)
+        second = Country.objects.create(name='Costa  Rica!', code='CR2', continent=self.asia)
+        second.code = 'CRC'
+        with CaptureQueriesContext(connection) as context:
+            second.save()
+        self.assertEqual(second.slug, 'costa-rica-2')
+        self.assertFalse([q for q in context.captured_queries if q['sql'].startswith('SELECT') and 'slug' in q['sql']])
+
+
+class DepartureCalendarTests(CatalogTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_tours(4)  # departing 2026-11-01 … 2026-11-04
+        self.url = f'/tourntrips/countries/{self.country.id}/departures/calendar/'
+
+    def test_default_window_starts_today(self):
+        with patch('django.utils.timezone.localdate', return_value=date(2026, 11, 2)):
+            data = self.client.get(self.url).json()
+        self.assertEqual((data['from'], data['to'], data['group']), ('2026-11-02', '2027-11-01', 'day'))
+        self.assertEqual([row['date'] for row in data['results']], ['2026-11-02', '2026-11-03', '2026-11-04'])
+        self.assertEqual(data['results'][0]['tours'], 1)
+
+    def test_window_is_inclusive_and_groups_by_month(self):
+        data = self.client.get(self.url, {'from': '2026-11-01', 'to': '2026-11-03'}).json()
+        self.assertEqual([row['date'] for row in data['results']], ['2026-11-01', '2026-11-02', '2026-11-03'])
+
+        data = self.client.get(self.url, {'from': '2026-10-01', 'to': '2026-12-31', 'group': 'month'}).json()
+        self.assertEqual(len(data['results']), 1)
+        row = data['results'][0]
+        self.assertEqual((row['date'], row['tours']), ('2026-11', 4))
+        self.assertEqual(
+            Decimal(str(row['min_price'])), min(TournTrips.objects.values_list('final_price', flat=True))
+        )
+
+    def test_invalid_windows_are_rejected(self):
+        for params, field in [
+            ({'from': '2026-11-31'}, 'from'),
+            ({'to': 'tomorrow'}, 'to'),
+            ({'from': '2026-11-05', 'to': '2026-11-04'}, 'to'),
+            ({'from': '2026-01-01', 'to': '2028-01-02'}, 'to'),
+            ({'group': 'week'}, 'group'),
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json())
+
+    def test_window_may_end_at_date_max(self):
+        data = self.client.get(self.url, {'from': '9999-12-01'}).json()
+        self.assertEqual((data['from'], data['to'], data['results']), ('9999-12-01', '9999-12-31', []))
+
+        response = self.client.get(self.url, {'from': '9999-12-01', 'to': '9999-12-31'})
+        self.assertEqual(response.status_code, 200)
+
+
+class TourBatchTests(CatalogTestMixin, TestCase):
+    url = '/tourntrips/tours/'
+
+    def test_input_order_duplicates_and_missing(self):
+        tours = self.create_tours(3)
+        ids = [tour.id for tour in tours]
+        with self.assertNumQueries(2):  # tours + destinations
+            response = self.client.get(self.url, {'ids': f'{ids[2]}, {ids[0]},{ids[2]},999999,,{ids[1]}'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([tour['id'] for tour in data['results']], [ids[2], ids[0], ids[1]])
+        self.assertEqual(data['missing'], [999999])
+
+    def test_limit(self):
+        ids = ','.join(str(n) for n in range(1, MAX_BATCH_TOURS + 1))
+        self.assertEqual(self.client.get(self.url, {'ids': ids}).status_code, 200)
+        self.assertEqual(self.client.get(self.url, {'ids': f'{ids},{ids}'}).status_code, 200)  # deduplicated
+        response = self.client.get(self.url, {'ids': f'{ids},{MAX_BATCH_TOURS + 1}'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_ids(self):
+        for value in ['', ',', '1,abc', '1,²', '-1', '1.5', '١', str(2 ** 63)]:
+            with self.subTest(ids=value):
+                response = self.client.get(self.url, {'ids': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('ids', response.json())
+
+
+def image_upload(name='cover.png', size=(1200, 800), color=(200, 30, 30)):
+    """A small in-memory PNG upload."""
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class TourImageTestMixin(CatalogTestMixin):
+    """Tour images under a temporary MEDIA_ROOT; the variants task is recorded, not run."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(self.settings(MEDIA_ROOT=media_root))
+        self.queued = self.enterContext(patch.object(generate_tour_image_variants, 'delay'))
+        self.tour = self.create_tours(1)[0]
+
+    def set_image(self, tour, upload):
+        tour.image = upload
+        with self.captureOnCommitCallbacks(execute=True):
+            tour.save()
+
+    def process(self, tour, force=False):
+        with self.captureOnCommitCallbacks(execute=True):
+            processed = process_tour_image(tour.pk, force=force)
+        tour.refresh_from_db()
+        return processed
+
+
+class ImageVariantTests(TourImageTestMixin, TestCase):
+
+    def test_variant_widths_and_srcset(self):
+        self.set_image(self.tour, image_upload(size=(1200, 800)))
+        self.assertTrue(self.process(self.tour))
+
+        variants = self.tour.image_variants
+        self.assertEqual(variants['source'], self.tour.image.name)
+        self.assertEqual(sorted(variants['webp'], key=int), ['160', '320', '640', '1024'])
+        storage = self.tour.image.storage
+        for width, name in variants['webp'].items():
+            self.assertTrue(name.startswith('tours/variants/') and name.endswith('.webp'))
+            with storage.open(name) as f, Image.open(f) as variant:
+                self.assertEqual(variant.format, 'WEBP')
+                self.assertEqual(variant.size, (int(width), round(int(width) * 800 / 1200)))
+
+        data = self.client.get(f'/tourntrips/tours/{self.tour.pk}/').json()
+        self.assertEqual([variant['width'] for variant in data['image_variants']], [160, 320, 640, 1024])
+        self.assertEqual(
+            data['image_srcset'],
+            ', '.join(f"http://testserver{storage.url(variants['webp'][w])} {w}w" for w in ('160', '320', '640', '1024')),
+        )
+
+    def test_small_images_are_not_upscaled(self):
+        self.set_image(self.tour, image_upload(size=(200, 100)))
+        self.process(self.tour)
+        self.assertEqual(sorted(self.tour.image_variants['webp'], key=int), ['160', '200'])
+
+    def test_queued_on_upload_and_regenerated_when_the_image_changes(self):
+        self.assertFalse(self.queued.called)  # no image yet
+        self.set_image(self.tour, image_upload(color=(10, 10, 10)))
+        self.queued.assert_called_once_with(self.tour.pk)
+        self.process(self.tour)
+        first = self.tour.image_variants
+
+        self.tour.title = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tour.save()
+        self.assertEqual(self.queued.call_count, 1)  # same image
+        self.assertFalse(self.process(self.tour))     # already up to date
+        self.assertTrue(self.process(self.tour, force=True))
+
+        self.set_image(self.tour, image_upload(color=(250, 250, 250)))
+        self.assertEqual(self.queued.call_count, 2)
+        # Until the task runs, the old variants aren't served for the new image
+        data = self.client.get(f'/tourntrips/tours/{self.tour.pk}/').json()
+        self.assertEqual((data['image_variants'], data['image_srcset']), ([], None))
+
+        self.assertTrue(self.process(self.tour))
+        self.assertEqual(self.tour.image_variants['source'], self.tour.image.name)
+        self.assertNotEqual(self.tour.image_variants['webp'], first['webp'])
+
+
+class ImageMetadataTests(TourImageTestMixin, TestCase):
+
+    def test_dimensions_size_color_and_placeholder(self):
+        self.set_image(self.tour, image_upload(size=(300, 150), color=(255, 0, 0)))
+        self.process(self.tour)
+
+        self.assertEqual((self.tour.image_width, self.tour.image_height), (300, 150))
+        self.assertEqual(self.tour.image_bytes, self.tour.image.size)
+        self.assertEqual(self.tour.image_color, '#ff0000')
+
+        prefix = 'data:image/webp;base64,'
+        self.assertTrue(self.tour.image_placeholder.startswith(prefix))
+        placeholder = base64.b64decode(self.tour.image_placeholder[len(prefix):])
+        self.assertLess(len(placeholder), 1000)
+        with Image.open(BytesIO(placeholder)) as image:
+            self.assertEqual(image.size, (16, 8))
+
+        data = self.client.get(f'/tourntrips/tours/{self.tour.pk}/').json()
+        self.assertEqual(
+            {key: data[key] for key in ('image_width', 'image_height', 'image_color')},
+            {'image_width': 300, 'image_height': 150, 'image_color': '#ff0000'},
+        )
+
+    def test_exif_orientation_is_applied(self):
+        buffer = BytesIO()
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotated 90° – displayed portrait
+        Image.new('RGB', (400, 200), (0, 0, 255)).save(buffer, 'JPEG', exif=exif)
+        self.set_image(self.tour, SimpleUploadedFile('rotated.jpg', buffer.getvalue(), content_type='image/jpeg'))
+        self.process(self.tour)
+        self.assertEqual((self.tour.image_width, self.tour.image_height), (200, 400))
+
+    def test_cleared_when_the_image_is_replaced(self):
+        self.set_image(self.tour, image_upload())
+        self.process(self.tour)
+        self.assertIsNotNone(self.tour.image_bytes)
+
+        self.set_image(self.tour, image_upload(color=(0, 255, 0)))
+        self.tour.refresh_from_db()
+        self.assertEqual(
+            (self.tour.image_width, self.tour.image_height, self.tour.image_bytes,
+             self.tour.image_color, self.tour.image_placeholder),
+            (None, None, None, '', ''),
+        )
+        self.process(self.tour)
+        self.assertEqual(self.tour.image_color, '#00ff00')
+
+
+class ContentHashStorageTests(TourImageTestMixin, TestCase):
+
+    def test_uploads_are_named_after_their_bytes(self):
+        upload = image_upload('India Banner.PNG')
+        digest = hashlib.sha256(upload.read()).hexdigest()[:32]
+        upload.seek(0)
+        self.set_image(self.tour, upload)
+        self.assertEqual(self.tour.image.name, f'tours/{digest}.png')
+        self.assertTrue(self.tour.image.storage.exists(self.tour.image.name))
+
+        # Changed bytes → a new name; the old URL keeps returning the old image
+        old_name = self.tour.image.name
+        self.set_image(self.tour, image_upload('India Banner.PNG', color=(1, 2, 3)))
+        self.assertNotEqual(self.tour.image.name, old_name)
+        self.assertTrue(self.tour.image.storage.exists(old_name))
+
+    def test_hashed_names_are_served_immutable(self):
+        self.set_image(self.tour, image_upload())
+        storage = self.tour.image.storage
+        legacy = FileSystemStorage(location=storage.location).save('tours/legacy.png', image_upload())  # pre-hashing name
+        factory = RequestFactory()
+
+        def get(path):
+            return serve_media(factory.get(f'/media/{path}'), path, document_root=storage.location)
+
+        response = get(self.tour.image.name)
+        self.assertEqual((response.status_code, response['Cache-Control']), (200, IMMUTABLE))
+        self.assertNotIn('Cache-Control', get(legacy))
+        with self.assertRaises(Http404):
+            get('tours/' + '0' * 32 + '.png')
+
+
+class ImageDedupeTests(TourImageTestMixin, TestCase):
+
+    def files(self):
+        return sorted(self.tour.image.storage.listdir('tours')[1])
+
+    def test_identical_uploads_share_one_file(self):
+        other = self.create_tours(1)[0]
+        self.set_image(self.tour, image_upload('a.png'))
+        self.set_image(other, image_upload('b.png'))
+        self.assertEqual(self.tour.image.name, other.image.name)
+        self.assertEqual(len(self.files()), 1)
+
+    def test_identical_reupload_keeps_metadata(self):
+        self.set_image(self.tour, image_upload('first.png'))
+        self.process(self.tour)
+        processed = (self.tour.image.name, self.tour.image_width, self.tour.image_bytes, self.tour.image_variants)
+
+        self.set_image(self.tour, image_upload('again.png'))
+        self.tour.refresh_from_db()
+        self.assertEqual(
+            (self.tour.image.name, self.tour.image_width, self.tour.image_bytes, self.tour.image_variants), processed
+        )
+        self.assertEqual(self.queued.call_count, 1)  # nothing to regenerate
+
+    def test_command_merges_existing_duplicates(self):
+        # Files from before the content-hashed storage, with their own names
+        legacy = FileSystemStorage(location=self.tour.image.storage.location)
+        first = legacy.save('tours/first.png', image_upload())
+        second = legacy.save('tours/second.png', image_upload())
+        unique = legacy.save('tours/unique.png', image_upload(color=(0, 0, 0)))
+        other = self.create_tours(1)[0]
+        TournTrips.objects.filter(pk=self.tour.pk).update(
+            image=first, image_variants={'source': first, 'webp': {'160': 'tours/variants/x.webp'}}, image_bytes=1,
+        )
+        TournTrips.objects.filter(pk=other.pk).update(image=second)
+
+        call_command('dedupe_tour_images', '--dry-run', stdout=StringIO())
+        self.assertEqual(self.files(), ['first.png', 'second.png', 'unique.png'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('dedupe_tour_images', stdout=StringIO())
+        self.tour.refresh_from_db()
+        other.refresh_from_db()
+        canonical = self.tour.image.name
+        self.assertRegex(canonical, r'^tours/[0-9a-f]{32}\.png$')
+        self.assertEqual(other.image.name, canonical)
+        self.assertEqual(self.files(), sorted([canonical.split('/')[1], 'unique.png']))
+        # Same bytes, so the variants still belong to the image
+        self.assertEqual(self.tour.image_variants['source'], canonical)
+        self.assertFalse(self.queued.called)
+
+
+class AdminDestinationPickerTests(CatalogTestMixin, TestCase):
+    """The tour admin's JSON pickers serve a cached per-country destination list."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def cities(self, *destinations, country=True):
+        params = {'dest_ids': [destination.id for destination in destinations]}
+        if country:
+            params['country_id'] = self.country.id
+        response = self.client.get(reverse('admin:tourn_trips_ajax_cities_checkboxes'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['cities']
+
+    def destination_queries(self, context):
+        return [q for q in context.captured_queries if 'toursntrips_destination' in q['sql']]
+
+    def test_staff_only(self):
+        url = reverse('admin:tourn_trips_ajax_cities_checkboxes')
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_user('visitor', password='password'))
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_cities_of_the_selected_destinations(self):
+        first, second, _ = self.destinations
+        self.assertEqual(self.cities(second, first), ['City 0', 'City 1'])
+        self.assertEqual(self.cities(second, country=False), ['City 1'])
+        self.assertEqual(self.cities(), [])
+
+        url = reverse('admin:tourn_trips_ajax_cities_checkboxes')
+        for params in [{'dest_ids': 'abc'}, {'dest_ids': '²'}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, params).status_code, 400)
+
+    def test_cached_until_destinations_change(self):
+        first = self.destinations[0]
+        self.cities(first)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.cities(first), ['City 0'])
+        self.assertEqual(self.destination_queries(context), [])
+
+        first.city = 'Harbour'
+        with self.captureOnCommitCallbacks(execute=True):
+            first.save()
+        self.assertEqual(self.cities(first), ['Harbour'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            added = Destination.objects.create(name='New', city='Port', country=self.country)
+        self.assertEqual(self.cities(first, added), ['Harbour', 'Port'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            added.country = Country.objects.create(name='Nepal', code='NPL', continent=self.country.continent)
+            added.save()
+        self.assertEqual(self.cities(first, added), ['Harbour'])
+
+
+class AdminDestinationAutocompleteTests(CatalogTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.nepal = Country.objects.create(name='Nepal', code='NPL', continent=self.country.continent)
+        self.elsewhere = Destination.objects.create(name='Destination Far', city='Kathmandu', country=self.nepal)
+
+    def search(self, **params):
+        return self.client.get(reverse('admin:tourn_trips_ajax_destinations_search'), params)
+
+    def test_pages_of_one_country(self):
+        Destination.objects.bulk_create(
+            Destination(name=f'Extra {i:02}', city='Harbour', country=self.country) for i in range(22)
+        )
+        first = self.search(country_id=self.country.id).json()
+        second = self.search(country_id=self.country.id, page=2).json()
+        self.assertEqual((len(first['results']), first['pagination']['more']), (20, True))
+        self.assertEqual((len(second['results']), second['pagination']['more']), (5, False))
+        names = [row['text'] for row in first['results'] + second['results']]
+        self.assertEqual(names, sorted(names))
+        self.assertNotIn('Destination Far', names)
+        self.assertEqual(first['results'][0], {'id': self.destinations[0].id, 'text': 'Destination 0', 'city': 'City 0'})
+        self.assertEqual(self.search(country_id=self.country.id, page=3).json()['results'], [])
+
+    def test_term_matches_name_or_city(self):
+        def texts(term):
+            return [row['text'] for row in self.search(country_id=self.country.id, term=term).json()['results']]
+
+        self.assertEqual(texts('destination 1'), ['Destination 1'])
+        self.assertEqual(texts('  CITY 2 '), ['Destination 2'])
+        self.assertEqual(texts('kathmandu'), [])
+
+    def test_invalid_requests(self):
+        for params in [{}, {'country_id': 'x'}, {'country_id': '²'}, {'country_id': 1, 'page': 0}, {'country_id': 1, 'page': 'two'}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.search(**params).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.search(country_id=self.country.id).status_code, 302)
+
+    def form_errors(self, **data):
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(username='admin')
+        form_class = TournTripsAdmin(TournTrips, admin.site).get_form(request)
+        query = QueryDict(mutable=True)
+        for key, value in data.items():
+            query.setlist(key, value if isinstance(value, list) else [value])
+        form = form_class(data=query)
+        form.is_valid()
+        return form.errors.get('destinations', [])
+
+    def test_destinations_must_be_in_the_country(self):
+        self.assertEqual(self.form_errors(country=self.country.id, destinations=[self.destinations[0].id]), [])
+        self.assertTrue(self.form_errors(country=self.country.id, destinations=[self.elsewhere.id]))
+        self.assertEqual(
+            self.form_errors(destinations=[self.destinations[0].id]),
+            ['Please select a country before choosing destinations.'],
+        )
+
+
+class BulkTourUpdateCommandTests(CatalogTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tours = self.create_tours(5)
+
+    def run_command(self, *args):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(*args, stdout=out)
+        return out.getvalue()
+
+    def documents(self):
+        return dict(TourSearchDocument.objects.values_list('tour_id', 'departure_date'))
+
+    def test_set_based_update_syncs_documents_and_versions(self):
+        today = date(2026, 11, 3)  # Tour 2 already departs that day
+        TournTrips.objects.filter(pk=self.tours[2].pk).update(updated_at=datetime(2020, 1, 1, tzinfo=dt_timezone.utc))
+        version = get_catalog_version(country_scope(self.country.id))
+        with patch('django.utils.timezone.localdate', return_value=today):
+            output = self.run_command('update_departure_dates')
+
+        self.assertIn('Updating 4 TourTrips instances', output)
+        self.assertEqual(set(TournTrips.objects.values_list('departure_date', flat=True)), {today})
+        self.assertEqual(set(self.documents().values()), {today})
+        self.assertEqual(TournTrips.objects.get(pk=self.tours[2].pk).updated_at.year, 2020)  # left alone
+        self.assertGreater(get_catalog_version(country_scope(self.country.id)), version)
+
+    def test_row_by_row_update_syncs_documents(self):
+        self.run_command('update_tour_prices')
+        prices = dict(TournTrips.objects.values_list('id', 'final_price'))
+        self.assertNotEqual(prices[self.tours[0].pk], Decimal('90.00'))
+        self.assertEqual(dict(TourSearchDocument.objects.values_list('tour_id', 'final_price')), prices)
+
+    def test_dry_run_writes_nothing(self):
+        before = list(TournTrips.objects.values_list('id', 'departure_date', 'shadow_price', 'updated_at'))
+        documents = self.documents()
+        version = get_catalog_version(country_scope(self.country.id))
+        for command in ('update_departure_dates', 'update_tour_prices'):
+            with self.subTest(command=command), CaptureQueriesContext(connection) as context:
+                output = self.run_command(command, '--dry-run')
+                self.assertIn('Dry run: would update 5 instances.', output)
+                writes = [q['sql'] for q in context.captured_queries if not q['sql'].startswith('SELECT')]
+                self.assertEqual(writes, [])
+        self.assertEqual(list(TournTrips.objects.values_list('id', 'departure_date', 'shadow_price', 'updated_at')), before)
+        self.assertEqual(self.documents(), documents)
+        self.assertEqual(get_catalog_version(country_scope(self.country.id)), version)
+
+    def test_batches(self):
+        with CaptureQueriesContext(connection) as context:
+            output = self.run_command('update_tour_prices', '--batch-size', '2')
+        self.assertEqual(
+            [line.split(' tours')[0].strip() for line in output.splitlines() if ' tours (' in line],
+            ['2/5', '4/5', '5/5'],
+        )
+        transactions = [q for q in context.captured_queries if q['sql'].startswith('SAVEPOINT')]
+        self.assertEqual(len(transactions), 3)  # one per chunk (inside the test's transaction)
+
+        with self.assertRaises(CommandError):
+            call_command('update_tour_prices', '--batch-size', '0', stdout=StringIO())
+
+    def test_command_without_an_update_is_rejected(self):
+        class Nothing(BulkTourUpdateCommand):
+            pass
+
+        class NoFields(BulkTourUpdateCommand):
+            def change(self, tour, options):
+                tour.title = 'Changed'
+
+        for command, message in [(Nothing(), 'neither update_values() nor change()'), (NoFields(), 'no fields')]:
+            with self.subTest(message=message), self.assertRaisesMessage(CommandError, message):
+                call_command(command, stdout=StringIO())
+        self.assertFalse(TournTrips.objects.filter(title='Changed').exists())
+
+
+class CatalogExportImportTests(CatalogTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tours = self.create_tours(3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tours[1].destinations.set(self.destinations[:1])
+            self.tours[2].shadow_price = None
+            self.tours[2].save()
+        Destination.objects.filter(pk=self.destinations[0].pk).update(description='')
+
+    def export(self):
+        out = StringIO()
+        catalog_io.write_jsonl(out)
+        return out.getvalue()
+
+    def load(self, text, *args):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False, encoding='utf-8') as f:
+            f.write(text)
+        self.addCleanup(os.remove, f.name)
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_catalog', f.name, *args, stdout=out)
+        return out.getvalue()
+
+    def records(self, text):
+        return [json.loads(line) for line in text.splitlines()]
+
+    def empty_database(self):
+        for model in (TournTrips, Destination, AdventureStyle, Country, Continent):
+            model.objects.all().delete()
+
+    def test_jsonl_round_trip_into_an_empty_database(self):
+        exported = self.export()
+        fields = ['tour_id', 'final_price', 'savings', 'popularity', 'nights', 'destination_cities']
+        documents = list(TourSearchDocument.objects.order_by('tour_id').values(*fields))
+        self.empty_database()
+
+        self.load(exported, '--update-by-id')
+        self.assertEqual(self.export(), exported)
+        self.assertEqual(list(TourSearchDocument.objects.order_by('tour_id').values(*fields)), documents)
+        self.assertEqual(Country.objects.get().slug, 'india')
+        self.assertEqual(TournTrips.objects.get(pk=self.tours[0].pk).duration, '4 nights 5 days')
+        self.assertEqual(sorted(search.search_tour_ids('destination 2')), [self.tours[0].pk, self.tours[2].pk])
+
+    def test_csv_round_trip(self):
+        exported = self.export()
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        call_command('export_catalog', directory, '--format', 'csv', stderr=StringIO())
+        self.empty_database()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_catalog', directory, '--batch-size', '2', '--update-by-id', stdout=StringIO())
+        # CSV has no NULL – a missing description comes back as ''
+        expected = [
+            {key: '' if key == 'description' and value is None else value for key, value in record.items()}
+            for record in self.records(exported)
+        ]
+        self.assertEqual(self.records(self.export()), expected)
+
+    def test_tours_are_appended_by_default(self):
+        records = self.records(self.export())
+        tours = list(TournTrips.objects.order_by('id').values_list('id', 'title', 'updated_at'))
+        renamed = [{**r, 'title': f"Copy of {r['title']}"} if r['type'] == 'tour' else r for r in records]
+        output = self.load('\n'.join(json.dumps(r) for r in renamed))
+
+        self.assertIn('3 tour created (0 already present)', output)
+        self.assertEqual(list(TournTrips.objects.order_by('id').values_list('id', 'title', 'updated_at'))[:3], tours)
+        copy = TournTrips.objects.get(title='Copy of Tour 1')
+        self.assertGreater(copy.pk, self.tours[2].pk)
+        self.assertEqual(list(copy.destinations.all()), self.destinations[:1])
+        self.assertEqual(list(self.tours[1].destinations.all()), self.destinations[:1])
+
+    def test_import_by_id_is_idempotent(self):
+        exported = self.export()
+        output = self.load(exported, '--update-by-id')
+        self.assertIn('0 tour created, 3 updated', output)
+        self.assertEqual(TournTrips.objects.count(), 3)
+        self.assertEqual(self.export(), exported)
+
+    def test_upsert_by_id(self):
+        nepal = Country.objects.create(name='Nepal', code='NPL', continent=self.country.continent)
+        Destination.objects.create(name='Base Camp', city='Lukla', country=nepal)
+        tour = next(r for r in self.records(self.export()) if r['type'] == 'tour' and r['id'] == self.tours[1].pk)
+        versions = {c: get_catalog_version(country_scope(c.id)) for c in (self.country, nepal)}
+
+        moved = {**tour, 'title': 'Everest trek', 'country': 'NPL', 'destinations': [['Base Camp', 'Lukla']]}
+        added = {**tour, 'id': None, 'title': 'Added'}
+        with_id = {**tour, 'id': 5000, 'title': 'Restored'}
+        output = self.load('\n'.join(json.dumps(r) for r in (moved, added, with_id)), '--update-by-id')
+        self.assertIn('2 tour created, 1 updated', output)
+
+        updated = TournTrips.objects.get(pk=self.tours[1].pk)
+        self.assertEqual((updated.title, updated.country_id), ('Everest trek', nepal.id))
+        self.assertEqual([d.name for d in updated.destinations.all()], ['Base Camp'])
+        self.assertEqual(updated.search_document.destination_cities, '|Lukla|')
+        self.assertEqual(search.search_tour_ids('everest'), [updated.pk])
+        for country, version in versions.items():
+            self.assertGreater(get_catalog_version(country_scope(country.id)), version)
+
+        self.assertEqual(TournTrips.objects.get(pk=5000).title, 'Restored')
+        self.assertGreater(TournTrips.objects.get(title='Added').pk, self.tours[2].pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertGreater(self.create_tours(1)[0].pk, 5000)
+
+    def test_malformed_input(self):
+        exported = self.records(self.export())
+        tour = next(r for r in exported if r['type'] == 'tour')
+        cases = [
+            ('{"type": "tour", ', 'Line 1: invalid JSON'),
+            (json.dumps({'type': 'planet', 'name': 'Mars'}), "unknown record type 'planet'"),
+            (json.dumps({**tour, 'country': 'XXX'}), "Unknown country 'XXX'"),
+            (json.dumps({**tour, 'adventure_style': 'Diving'}), "Unknown adventure style 'Diving'"),
+            (json.dumps({**tour, 'destinations': [['Nowhere', 'City 0']]}), 'Unknown destination'),
+            (json.dumps({**tour, 'departure_date': '2026-02-30'}), 'Invalid tour record'),
+            (json.dumps({key: value for key, value in tour.items() if key != 'title'}), 'Invalid tour record'),
+        ]
+        for text, message in cases:
+            with self.subTest(message=message):
+                with self.assertRaisesMessage(CommandError, message):
+                    self.load(text)
+        with self.assertRaisesMessage(CommandError, 'Invalid tour record'):
+            self.load(json.dumps({**tour, 'id': 'abc'}), '--update-by-id')
+        self.assertEqual(TournTrips.objects.count(), 3)
+
+    def test_malformed_csv_destinations(self):
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        catalog_io.write_csv(directory)
+        path = os.path.join(directory, 'tours.csv')
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        rows[0]['destinations'] = '[["Destination 0"'
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=catalog_io.COLUMNS['tour'])
+            writer.writeheader()
+            writer.writerows(rows)
+        with self.assertRaisesMessage(CommandError, 'tours.csv line 2: invalid destinations'):
+            call_command('import_catalog', directory, stdout=StringIO())
+
+    def test_dry_run_rolls_back(self):
+        records = self.records(self.export())
+        new = [{**r, 'id': None} for r in records if r['type'] == 'tour']
+        output = self.load('\n'.join(json.dumps(r) for r in new), '--dry-run')
+        self.assertIn('Dry run, rolled back 3 records', output)
+        self.assertEqual(TournTrips.objects.count(), 3)
@@ -22,16 +22,28 @@ from .views import (
     AdventureStyleDetailView,
     CountryToursListView,
     CountryCitiesListView,
-    TourDetailView
+    TourDetailView,
+    TourSearchView,
+    CountryTourFacetsView,
+    CountryDepartureCalendarView,
+    TourBatchView,
+    CatalogTreeView
 )
 from . import views
 
 urlpatterns = [
+    path('catalog-tree/', CatalogTreeView.as_view(), name='catalog-tree'),
     path('continents/<int:id>/countries/', ContinentCountriesView.as_view(), name='continent-countries'),
     path('adventure-styles/', AdventureStyleListView.as_view(), name='adventure-style-list'),
     path('adventure-styles/<int:id>/', AdventureStyleDetailView.as_view(), name='adventure-style-detail'),
     path('countries/<int:country_id>/tours/', CountryToursListView.as_view(), name='country-tours'),
+    path('countries/<int:country_id>/tours/facets/', CountryTourFacetsView.as_view(), name='country-tour-facets'),
+    path('countries/<int:country_id>/departures/calendar/', CountryDepartureCalendarView.as_view(), name='country-departure-calendar'),
     path('countries/<int:country_id>/cities/', CountryCitiesListView.as_view(), name='country-cities'),
+    path('tours/', TourBatchView.as_view(), name='tour-batch'),
     path('tours/<int:id>/', TourDetailView.as_view(), name='tour-detail'),
     path('countries/', views.country_by_name, name='country-by-slug'),
+    path('countries/<slug:slug>/', views.country_by_slug, name='country-slug'),
+    path('search/', TourSearchView.as_view(), name='tour-search'),
+    path('autocomplete/', views.autocomplete, name='autocomplete'),
     ]
\ No newline at end of file
@@ -1,30 +1,43 @@
 # api/views.py
-from datetime import datetime
-from decimal import Decimal
+from collections import Counter
+from datetime import date, datetime, timedelta
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from .models import (
     Continent,
     AdventureStyle,
     Country,
     TournTrips,
-    Destination
+    Destination,
+    TourSearchDocument
     )
 from .serializers import (
     ContinentWithCountriesSerializer,
+    CatalogTreeSerializer,
     AdventureStyleSerializer,
     TournTripsSerializer,
-    CitySerializer
+    CitySerializer,
+    destination_names_prefetch
     )
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from .pagination import TenPerPagePagination
-from django.db.models import QuerySet
-from django.db.models import F, ExpressionWrapper, DecimalField, IntegerField
+from .pagination import TenPerPagePagination, KeysetPagination
+from . import snapshot
+from .search import search_tour_ids
+from .dates import departure_range, parse_date, parse_decimal, parse_int
+from .cache import CatalogCacheMixin, ProcessCache, ANY, GLOBAL, country_scope, catalog_fingerprint, get_catalog_modified, get_catalog_version
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.db.models import QuerySet, Count, F, Min, Q
+from django.db.models.functions import TruncMonth
 from rest_framework.filters import OrderingFilter
 from django.db.models import Prefetch
 from rest_framework import generics
 
 
-class ContinentCountriesView(generics.RetrieveAPIView):
+class ContinentCountriesView(CatalogCacheMixin, generics.RetrieveAPIView):
     """
     GET /api/continents/<id>/countries/
     Returns: { id, name, code, countries: [...] }
@@ -46,8 +59,41 @@ class ContinentCountriesView(generics.RetrieveAPIView):
 
 
 
+# --------------------------------------------------------------
+# GET /tourntrips/catalog-tree/
+# Every continent with its countries and their tour stats (navigation menu)
+# --------------------------------------------------------------
+class CatalogTreeView(CatalogCacheMixin, generics.ListAPIView):
+    """
+    GET /tourntrips/catalog-tree/
+    Returns: [ { id, name, code, slug, countries: [
+                 { id, name, code, slug, tour_count, min_price, next_departure }, ... ] }, ... ]
+
+    Two queries (continents, countries with aggregate annotations), cached
+    until any catalog version changes or the day rolls over (next_departure
+    is the first departure from today on).
+    """
+    serializer_class = CatalogTreeSerializer
+    pagination_class = None
+
+    def get_catalog_scopes(self):
+        return [ANY]
+
+    def get_catalog_cache_extra(self):
+        return (timezone.localdate(),)
+
+    def get_queryset(self):
+        today = timezone.localdate()
+        countries = Country.objects.annotate(
+            tour_count=Count('tours'),
+            min_price=Min('tours__final_price'),
+            next_departure=Min('tours__departure_date', filter=Q(tours__departure_date__gte=today)),
+        ).order_by('name')
+        return Continent.objects.prefetch_related(Prefetch('countries', queryset=countries)).order_by('name')
+
+
 # List all adventure styles
-class AdventureStyleListView(generics.ListAPIView):
+class AdventureStyleListView(CatalogCacheMixin, generics.ListAPIView):
     queryset = AdventureStyle.objects.all().order_by('name')
     serializer_class = AdventureStyleSerializer
 
@@ -76,7 +122,7 @@ class CountryToursListView(generics.ListAPIView):
     
 
 
-class CountryCitiesListView(generics.ListAPIView):
+class CountryCitiesListView(CatalogCacheMixin, generics.ListAPIView):
     """
     GET /tourntrips/countries/<country_id>/cities/
     Returns unique cities from destinations in that country.
@@ -84,6 +130,9 @@ class CountryCitiesListView(generics.ListAPIView):
     serializer_class = CitySerializer
     # pagination_class = TenPerPagePagination
 
+    def get_catalog_scopes(self):
+        return [country_scope(self.kwargs['country_id'])]
+
     def get_queryset(self) -> QuerySet:
         country_id = self.kwargs['country_id']
         country = get_object_or_404(Country, id=country_id)
@@ -106,7 +155,88 @@ class CountryCitiesListView(generics.ListAPIView):
 
 
 
-class CountryToursListView(generics.ListAPIView):
+def load_tours(tour_ids):
+    """Load tours ready for TournTripsSerializer, in the order of `tour_ids`."""
+    tours = TournTrips.objects.select_related(
+        'country', 'adventure_styles'
+    ).prefetch_related(destination_names_prefetch()).in_bulk(tour_ids)
+    return [tours[tour_id] for tour_id in tour_ids if tour_id in tours]
+
+
+def filter_tour_documents(queryset, params):
+    """
+    Apply the CountryToursListView query-param filters (price, city,
+    dates, style, start/end city) to a TourSearchDocument queryset.
+    Shared by the tour list and its facets so both see the same tours.
+    """
+    # Min/Max price filter (invalid values are ignored)
+    min_price = parse_decimal(params.get('min_price'))
+    if min_price is not None:
+        queryset = queryset.filter(shadow_price__gte=min_price)
+
+    max_price = parse_decimal(params.get('max_price'))
+    if max_price is not None:
+        queryset = queryset.filter(shadow_price__lte=max_price)
+
+    # City ID filter (assumes city_id refers to Destination.id)
+    city_id = params.get('city_id')
+    if city_id:
+        queryset = queryset.filter(destination_ids__contains=f",{city_id},")
+
+    city_name = params.get('city_name')      # <-- NEW
+    if city_name:
+        # case-insensitive contains
+        queryset = queryset.filter(destination_cities__icontains=city_name)
+
+    # Departure date / month / date range, as one sargable [start, end) range
+    window = departure_range(params)
+    if window:
+        start, end = window
+        if start:
+            queryset = queryset.filter(departure_date__gte=start)
+        if end:
+            queryset = queryset.filter(departure_date__lt=end)
+
+    adventure_style = params.getlist('adventure_style')
+    if adventure_style:
+        # Convert to ints, ignore invalid
+        try:
+            ids = [int(aid) for aid in adventure_style if aid.isdigit()]
+            if ids:
+                queryset = queryset.filter(adventure_style_id__in=ids)
+        except ValueError:
+            pass
+
+    # Start and end city filters (exact match)
+    start_city = params.get('start_city')
+    if start_city:
+        queryset = queryset.filter(start_city=start_city)
+
+    end_city = params.get('end_city')
+    if end_city:
+        queryset = queryset.filter(end_city=end_city)
+
+    return queryset
+
+
+# --------------------------------------------------------------
+# Conditional GET: validators come from the catalog versions (no
+# query, no serializer) so a matching If-None-Match gets a 304.
+# --------------------------------------------------------------
+def country_tours_etag(request, country_id):
+    return catalog_fingerprint(
+        'CountryToursListView', request, {'country_id': country_id},
+        [GLOBAL, country_scope(country_id)],
+        departure_range(request.GET),  # ?month= without a year depends on today
+    )
+
+
+def country_tours_last_modified(request, country_id):
+    return max(get_catalog_modified(GLOBAL), get_catalog_modified(country_scope(country_id)))
+
+
+@method_decorator(condition(etag_func=country_tours_etag, last_modified_func=country_tours_last_modified), name='get')
+class CountryToursListView(CatalogCacheMixin, generics.ListAPIView):
 
     """
     GET /tourntrips/countries/<country_id>/tours/
@@ -123,126 +253,126 @@ class CountryToursListView(generics.ListAPIView):
       ?min_price=100&max_price=1000 → tours with shadow_price in range [min, max]
       ?city_id=123 → tours including the destination with id=123
       ?departure_date=2025-11-05 → tours departing on exact date (YYYY-MM-DD)
-      ?month=11 → tours departing in the specified month (1-12)
+      ?month=11 → tours departing in the next November (current month included)
+      ?month=11&year=2027 → tours departing in November 2027
+      ?date_from=2026-11-01&date_to=2026-11-15 → departing in the range (inclusive)
       ?start_city=New York&end_city=Los Angeles → tours with exact start/end cities
+
+    Pagination:
+      ?page=2                    → page-number pagination (default)
+      ?pagination=cursor         → keyset pagination with opaque next/previous
+                                   cursors; pages cost the same at any depth
+
+    Filtering and sorting run against TourSearchDocument (one denormalized
+    row per tour), or against the in-memory snapshot when
+    CATALOG_SNAPSHOT_ENGINE is on; only the tours on the requested page are loaded.
+    Responses are cached until the country (or global) catalog version changes,
+    and carry ETag / Last-Modified headers for conditional GETs.
     """
 
     serializer_class = TournTripsSerializer
     pagination_class = TenPerPagePagination
     filter_backends = [OrderingFilter]
+    ordering_fields = [
+        'shadow_price', 'discount_percentage', 'rating', 'no_of_reviews',
+        'departure_date', 'start_city', 'end_city',
+    ]
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_catalog_scopes(self):
+        # Tours embed style and country names, so global changes count too
+        return [GLOBAL, country_scope(self.kwargs['country_id'])]
+
+    def get_catalog_cache_extra(self):
+        # Same extra part as country_tours_etag()
+        return (departure_range(self.request.query_params),)
 
     def get_queryset(self):
         country_id = self.kwargs['country_id']
         country = get_object_or_404(Country, id=country_id)
 
-        queryset = TournTrips.objects.filter(country=country).select_related(
-            'country', 'adventure_styles'
-        ).prefetch_related('destinations')
-
-        # Apply new filters
-        request = self.request
-
-        # Min/Max price filter
-        min_price = request.query_params.get('min_price')
-        if min_price:
-            queryset = queryset.filter(shadow_price__gte=Decimal(min_price))
-        
-        max_price = request.query_params.get('max_price')
-        if max_price:
-            queryset = queryset.filter(shadow_price__lte=Decimal(max_price))
-
-        # City ID filter (assumes city_id refers to Destination.id)
-        city_id = request.query_params.get('city_id')
-        if city_id:
-            queryset = queryset.filter(destinations__id=city_id)
-
-        city_name = request.query_params.get('city_name')      # <-- NEW
-        if city_name:
-            # case-insensitive contains
-            queryset = queryset.filter(destinations__city__icontains=city_name)
-
-        # Specific departure date filter
-        departure_date = request.query_params.get('departure_date')
-        if departure_date:
-            try:
-                # date_obj = datetime.strptime(departure_date, '%Y-%m-%d').date()
-                # queryset = queryset.filter(departure_date=date_obj)
-                pass
-            except ValueError:
-                # Invalid date format; queryset remains unchanged (or handle error as needed)
-                pass
-
-        # Month filter (1-12)
-        month = request.query_params.get('month')
-        if month:
-            try:
-                # month_int = int(month)
-                # if 1 <= month_int <= 12:
-                #     queryset = queryset.filter(departure_date__month=month_int)
-                pass
-            except ValueError:
-                # Invalid month; queryset remains unchanged
-                pass
-
-
-        adventure_style = self.request.query_params.getlist('adventure_style')
-        if adventure_style:
-            # Convert to ints, ignore invalid
-            try:
-                ids = [int(aid) for aid in adventure_style if aid.isdigit()]
-                if ids:
-                    queryset = queryset.filter(adventure_styles__id__in=ids)
-            except ValueError:
-                pass
-
-        # Start and end city filters (exact match)
-        start_city = request.query_params.get('start_city')
-        if start_city:
-            queryset = queryset.filter(start_city=start_city)
-
-        end_city = request.query_params.get('end_city')
-        if end_city:
-            queryset = queryset.filter(end_city=end_city)
+        queryset = filter_tour_documents(
+            TourSearchDocument.objects.filter(country=country), self.request.query_params
+        )
 
         # Apply ordering (existing logic)
-        filter_param = request.query_params.get('filter')
+        filter_param = self.request.query_params.get('filter')
 
         if filter_param == 'price=low':
-            queryset = queryset.order_by('shadow_price')
+            queryset = queryset.order_by('shadow_price', 'pk')
 
         elif filter_param == 'price=high':
-            queryset = queryset.order_by('-shadow_price')
+            queryset = queryset.order_by('-shadow_price', '-pk')
 
         elif filter_param == 'duration=short':
-            queryset = queryset.order_by('_nights')
+            queryset = queryset.order_by('nights', 'pk')
 
         elif filter_param == 'duration=long':
-            queryset = queryset.order_by('-_nights')
+            queryset = queryset.order_by('-nights', '-pk')
 
         elif filter_param == 'reviews=most':
-            queryset = queryset.order_by('-no_of_reviews')
+            queryset = queryset.order_by('-no_of_reviews', '-pk')
 
         elif filter_param == 'discount=high':
-            # Calculate savings: price * (discount / 100)
-            savings = ExpressionWrapper(
-                F('shadow_price') * F('discount_percentage') / 100,
-                output_field=DecimalField(max_digits=12, decimal_places=2)
-            )
-            queryset = queryset.annotate(savings=savings).order_by('-savings')
+            # savings = price * (discount / 100), precomputed on the document
+            queryset = queryset.order_by('-savings', '-pk')
 
         elif filter_param == 'popularity=high':
-            # Popularity = rating × number of reviews
-            popularity = ExpressionWrapper(
-                F('rating') * F('no_of_reviews'),
-                output_field=IntegerField()
-            )
-            queryset = queryset.annotate(popularity=popularity).order_by('-popularity')
+            # popularity = rating × number of reviews, precomputed on the document
+            queryset = queryset.order_by('-popularity', '-pk')
 
         else:
             # Default: newest departure first
-            queryset = queryset.order_by('departure_date')
+            queryset = queryset.order_by('departure_date', 'pk')
 
         return queryset
+
+    def get_tours(self, documents):
+        """Load the tours behind `documents`, keeping the documents' order."""
+        return load_tours([document.pk for document in documents])
+
+    def use_snapshot(self):
+        # The in-memory engine models ?filter= sorting and page numbers only
+        params = self.request.query_params
+        return snapshot.enabled() and params.get('pagination') != 'cursor' and not params.get('ordering')
+
+    def list(self, request, *args, **kwargs):
+        if self.use_snapshot():
+            return self.list_from_snapshot(request)
+
+        documents = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(documents)
+        if page is not None:
+            serializer = self.get_serializer(self.get_tours(page), many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(self.get_tours(documents), many=True)
+        return Response(serializer.data)
+
+    def list_from_snapshot(self, request):
+        catalog = snapshot.get_snapshot()
+        country_id = self.kwargs['country_id']
+        if not catalog.has_country(country_id):
+            raise Http404('No Country matches the given query.')
+
+        tour_ids = catalog.query(country_id, request.query_params)
+
+        page = self.paginate_queryset(tour_ids)
+        if page is not None:
+            serializer = self.get_serializer(load_tours(page), many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(load_tours(tour_ids), many=True)
+        return Response(serializer.data)
     
 
 
@@ -251,18 +381,257 @@ class CountryToursListView(generics.ListAPIView):
 
 
 
+# --------------------------------------------------------------
+# GET /tourntrips/countries/<country_id>/tours/facets/
+# Counts for the filter sidebar, computed in one pass
+# --------------------------------------------------------------
+PRICE_BUCKETS = [(0, 500), (500, 1000), (1000, 2500), (2500, 5000), (5000, None)]
+NIGHTS_BUCKETS = [(0, 3), (4, 7), (8, 14), (15, None)]
+
+
+def _bucket_index(buckets, value, upper_inclusive):
+    for index, (low, high) in enumerate(buckets):
+        if value >= low and (high is None or value < high or (upper_inclusive and value == high)):
+            return index
+    return None
+
+
+# Facet → the query params that filter on it. Each of these facets is
+# counted with every filter except its own (disjunctive faceting), so
+# picking one style still shows how many tours the other styles have.
+FACET_PARAMS = {
+    'adventure_styles': ('adventure_style',),
+    'price': ('min_price', 'max_price'),
+    'departure_months': ('departure_date', 'month', 'year', 'date_from', 'date_to'),
+    'start_cities': ('start_city',),
+}
+
+
+def count_facets(rows):
+    """One pass over (style_id, price, departure_date, nights, start_city) rows."""
+    counts = {
+        'count': 0,
+        'adventure_styles': Counter(),
+        'price': [0] * len(PRICE_BUCKETS),
+        'departure_months': Counter(),
+        'nights': [0] * len(NIGHTS_BUCKETS),
+        'start_cities': Counter(),
+    }
+    for style_id, price, departure_date, tour_nights, start_city in rows:
+        counts['count'] += 1
+        counts['adventure_styles'][style_id] += 1
+        if price is not None:
+            index = _bucket_index(PRICE_BUCKETS, price, upper_inclusive=False)
+            if index is not None:
+                counts['price'][index] += 1
+        counts['departure_months'][departure_date.strftime('%Y-%m')] += 1
+        index = _bucket_index(NIGHTS_BUCKETS, tour_nights, upper_inclusive=True)
+        if index is not None:
+            counts['nights'][index] += 1
+        if start_city:
+            counts['start_cities'][start_city] += 1
+    return counts
+
+
+class CountryTourFacetsView(CatalogCacheMixin, generics.ListAPIView):
+    """
+    GET /tourntrips/countries/<country_id>/tours/facets/
+    Accepts the same filters as CountryToursListView and returns, for the
+    tours they match, counts per adventure style, price bucket
+    (shadow_price, [min, max) ), departure month, nights bucket
+    ([min, max] nights) and start city. The style, price, month and start
+    city counts ignore their own filter (FACET_PARAMS), so they list the
+    alternatives to what is selected.
+
+    One query over TourSearchDocument, plus one per facet whose filter is
+    set and one for style names; the counting is a single pass in Python.
+    """
+    pagination_class = None
+
+    def get_catalog_scopes(self):
+        return [GLOBAL, country_scope(self.kwargs['country_id'])]
+
+    def get_catalog_cache_extra(self):
+        return (departure_range(self.request.query_params),)
+
+    def get_queryset(self):
+        country = get_object_or_404(Country, id=self.kwargs['country_id'])
+        return TourSearchDocument.objects.filter(country=country).values_list(
+            'adventure_style_id', 'shadow_price', 'departure_date', 'nights', 'start_city'
+        )
+
+    def list(self, request, *args, **kwargs):
+        documents = self.get_queryset()
+        params = request.query_params
+        counts = count_facets(filter_tour_documents(documents, params))
+        for facet, own_params in FACET_PARAMS.items():
+            if any(params.get(param) for param in own_params):
+                others = params.copy()
+                for param in own_params:
+                    others.pop(param, None)
+                counts[facet] = count_facets(filter_tour_documents(documents, others))[facet]
+
+        styles = counts['adventure_styles']
+        style_names = dict(AdventureStyle.objects.filter(id__in=styles).values_list('id', 'name'))
+
+        return Response({
+            'count': counts['count'],
+            'adventure_styles': [
+                {'id': style_id, 'name': style_names.get(style_id), 'count': count}
+                for style_id, count in sorted(styles.items(), key=lambda item: style_names.get(item[0]) or '')
+            ],
+            'price': [
+                {'min': low, 'max': high, 'count': count}
+                for (low, high), count in zip(PRICE_BUCKETS, counts['price'])
+            ],
+            'departure_months': [
+                {'month': month, 'count': count} for month, count in sorted(counts['departure_months'].items())
+            ],
+            'nights': [
+                {'min': low, 'max': high, 'count': count}
+                for (low, high), count in zip(NIGHTS_BUCKETS, counts['nights'])
+            ],
+            'start_cities': [
+                {'city': city, 'count': count} for city, count in sorted(counts['start_cities'].items())
+            ],
+        })
+
+
+
+
+
+
+
+
+# --------------------------------------------------------------
+# GET /tourntrips/countries/<country_id>/departures/calendar/
+# Tours departing per day (or month) for the date picker
+# --------------------------------------------------------------
+CALENDAR_DEFAULT_DAYS = 365
+CALENDAR_MAX_DAYS = 731
+
+
+class CountryDepartureCalendarView(CatalogCacheMixin, generics.ListAPIView):
+    """
+    GET /tourntrips/countries/<country_id>/departures/calendar/
+      ?from=2026-11-01&to=2026-12-31 → window (inclusive); default today + 1 year
+      ?group=day | month              → one entry per departure day (default) or month
+
+    Every entry has the number of departing tours and their lowest
+    final_price. One grouped query over TournTrips, a range scan on the
+    (country, departure_date, id) index.
+    """
+    pagination_class = None
+
+    def get_catalog_scopes(self):
+        return [country_scope(self.kwargs['country_id'])]
+
+    def get_catalog_cache_extra(self):
+        # The default window moves with today
+        return self.get_window()
+
+    def get_window(self):
+        params = self.request.query_params
+        errors = {}
+        start = end = None
+        for param in ('from', 'to'):
+            if params.get(param) and parse_date(params[param]) is None:
+                errors[param] = 'Use YYYY-MM-DD.'
+        if not errors:
+            start = parse_date(params.get('from')) or timezone.localdate()
+            # The default window stops at date.max rather than overflowing
+            end = parse_date(params.get('to')) or start + timedelta(
+                days=min(CALENDAR_DEFAULT_DAYS - 1, (date.max - start).days)
+            )
+            if end < start:
+                errors['to'] = '"to" must not be before "from".'
+            elif (end - start).days >= CALENDAR_MAX_DAYS:
+                errors['to'] = f'At most {CALENDAR_MAX_DAYS} days per request.'
+        if params.get('group', 'day') not in ('day', 'month'):
+            errors['group'] = 'Use "day" or "month".'
+        if errors:
+            raise ValidationError(errors)
+        return start, end
+
+    def list(self, request, *args, **kwargs):
+        country = get_object_or_404(Country, id=self.kwargs['country_id'])
+        start, end = self.get_window()
+        group = request.query_params.get('group', 'day')
+
+        queryset = TournTrips.objects.filter(
+            country=country, departure_date__gte=start, departure_date__lte=end
+        )
+        period = TruncMonth('departure_date') if group == 'month' else F('departure_date')
+        rows = (
+            queryset.annotate(period=period)
+            .values('period')
+            .annotate(tours=Count('id'), min_price=Min('final_price'))
+            .order_by('period')
+        )
+
+        return Response({
+            'from': start,
+            'to': end,
+            'group': group,
+            'results': [
+                {
+                    'date': row['period'].strftime('%Y-%m' if group == 'month' else '%Y-%m-%d'),
+                    'tours': row['tours'],
+                    'min_price': row['min_price'],
+                }
+                for row in rows
+            ],
+        })
+
+
+
+
+
+
+
+
 # --------------------------------------------------------------
 # GET /api/tours/<int:id>/
 # Returns a single tour with all related data (destinations, adventure style, etc.)
 # --------------------------------------------------------------
+def _tour_state(request, id):
+    # (updated_at, country_id) – looked up once for both validators
+    if not hasattr(request, '_tour_state'):
+        request._tour_state = TournTrips.objects.filter(id=id).values_list('updated_at', 'country_id').first()
+    return request._tour_state
+
+
+def tour_detail_etag(request, id):
+    state = _tour_state(request, id)
+    if state is None:
+        return None
+    updated_at, country_id = state
+    # Destinations / style / country names live outside the tour row,
+    # so their versions are part of the tag too.
+    return catalog_fingerprint(
+        'TourDetailView', request, {'id': id},
+        [GLOBAL, country_scope(country_id)], updated_at.isoformat(),
+    )
+
+
+def tour_detail_last_modified(request, id):
+    state = _tour_state(request, id)
+    if state is None:
+        return None
+    updated_at, country_id = state
+    return max(updated_at, get_catalog_modified(GLOBAL), get_catalog_modified(country_scope(country_id)))
+
+
+@method_decorator(condition(etag_func=tour_detail_etag, last_modified_func=tour_detail_last_modified), name='get')
 class TourDetailView(generics.RetrieveAPIView):
     """
     GET /api/tours/<int:id>/
     Returns a single TournTrips object with full details.
+    Sends ETag / Last-Modified; a matching If-None-Match gets a 304.
     """
     queryset = TournTrips.objects.select_related(
         'country', 'adventure_styles'
-    ).prefetch_related('destinations')
+    ).prefetch_related(destination_names_prefetch())
     serializer_class = TournTripsSerializer
     lookup_field = 'id'
 
@@ -273,58 +642,165 @@ class TourDetailView(generics.RetrieveAPIView):
 
 
 
+# --------------------------------------------------------------
+# GET /tourntrips/tours/?ids=1,2,3
+# Several tours in one request (wishlist, comparison, recently viewed)
+# --------------------------------------------------------------
+MAX_BATCH_TOURS = 50
+MAX_TOUR_ID = 2 ** 63 - 1  # larger ids overflow the database integer
+
+
+class TourBatchView(generics.ListAPIView):
+    """
+    GET /tourntrips/tours/?ids=12,7,31
+    Returns { results: [...], missing: [...] } – the tours in the order of
+    `ids` (duplicates dropped) and the ids that don't exist. At most
+    MAX_BATCH_TOURS ids; the tours are loaded with one select_related
+    query plus one prefetch, as for a page of CountryToursListView.
+    """
+    serializer_class = TournTripsSerializer
+    pagination_class = None
+
+    def get_ids(self):
+        raw = [part.strip() for part in self.request.query_params.get('ids', '').split(',') if part.strip()]
+        if not raw:
+            raise ValidationError({'ids': 'Pass a comma-separated list of tour ids, e.g. ?ids=1,2,3.'})
+        ids = [parse_int(part) for part in raw]
+        if None in ids or max(ids) > MAX_TOUR_ID:
+            raise ValidationError({'ids': 'Tour ids must be integers.'})
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > MAX_BATCH_TOURS:
+            raise ValidationError({'ids': f'At most {MAX_BATCH_TOURS} ids per request.'})
+        return ids
+
+    def list(self, request, *args, **kwargs):
+        ids = self.get_ids()
+        tours = load_tours(ids)
+        found = {tour.pk for tour in tours}
+        return Response({
+            'results': self.get_serializer(tours, many=True).data,
+            'missing': [tour_id for tour_id in ids if tour_id not in found],
+        })
+
+
+
+
+
+
+
+
+# --------------------------------------------------------------
+# GET /tourntrips/search/?q=<text>
+# Ranked full-text search (SQLite FTS5, see search.py)
+# --------------------------------------------------------------
+class TourSearchView(generics.ListAPIView):
+    """
+    GET /tourntrips/search/?q=eiffel tower
+    Returns paginated tours ranked by relevance over tour title,
+    destination names/descriptions, cities and country name.
+    Words are prefix-matched and all of them must match.
+    Optional: ?country_id=12 → only tours in that country
+    """
+    serializer_class = TournTripsSerializer
+    pagination_class = TenPerPagePagination
+
+    def get_queryset(self):
+        # Ranked tour ids; only the requested page is loaded as tours
+        country_id = self.request.query_params.get('country_id')
+        return search_tour_ids(
+            self.request.query_params.get('q', ''),
+            country_id=parse_int(country_id),
+        )
+
+    def list(self, request, *args, **kwargs):
+        tour_ids = self.get_queryset()
+
+        page = self.paginate_queryset(tour_ids)
+        if page is not None:
+            serializer = self.get_serializer(load_tours(page), many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(load_tours(tour_ids), many=True)
+        return Response(serializer.data)
+
+
+
+
+
+
+
+
 from django.http import JsonResponse
 from .models import Country
 from django.views.decorators.http import require_http_methods
+from django.utils.text import slugify
+from .autocomplete import get_index
 
-@require_http_methods(["GET"])
-def country_by_slug(request):
-    slug = request.GET.get('slug')
-    if not slug:
-        return JsonResponse({'error': 'slug parameter is required'}, status=400)
+def build_country_slug_map():
+    """slug → {'id', 'name', 'slug'} for every country, in one query."""
+    return {
+        slug: {'id': country_id, 'name': name, 'slug': slug}
+        for country_id, name, slug in Country.objects.values_list('id', 'name', 'slug')
+    }
 
-    try:
-        country = Country.objects.get(slug=slug)
-        data = {
-            'id': country.id,
-            'name': country.name,
-            'slug': country.slug,
-            # add other fields as needed
-        }
-        return JsonResponse(data)
-    except Country.DoesNotExist:
-        return JsonResponse({'error': 'Country not found'}, status=404)
-    
 
+country_slug_cache = ProcessCache(build_country_slug_map, GLOBAL)
 
 
+def country_slug_map():
+    """build_country_slug_map(), cached per process until the GLOBAL version moves."""
+    return country_slug_cache.get()
 
 
+@require_http_methods(["GET"])
+def country_by_slug(request, slug=None):
+    slug = slug or request.GET.get('slug')
+    if not slug:
+        return JsonResponse({'error': 'slug parameter is required'}, status=400)
 
+    country = country_slug_map().get(slug.strip().lower())
+    if country is None:
+        return JsonResponse({'error': 'Country not found'}, status=404)
+    return JsonResponse(country)
 
 
 @require_http_methods(["GET"])
 def country_by_name(request):
-    name = request.GET.get('slug')  # e.g. ?name=India  or  ?name=united states
+    name = request.GET.get('slug') or request.GET.get('name')  # e.g. ?name=India  or  ?name=united states
     if not name:
         return JsonResponse({'error': 'name parameter is required'}, status=400)
 
-    # Case-insensitive + partial match fallback (very forgiving)
+    countries = country_slug_map()
+    needle = name.strip().lower()
+
+    # First: the slug itself, or the name slugified ("united states" → "united-states")
+    country = countries.get(needle) or countries.get(slugify(needle))
+    if country is None:
+        # Second: partial match (e.g. "united" → "United States"), in memory
+        country = next(
+            (c for c in sorted(countries.values(), key=lambda c: c['name']) if needle in c['name'].lower()),
+            None,
+        )
+    if country is None:
+        return JsonResponse({'error': 'Country not found'}, status=404)
+
+    return JsonResponse(country)
+
+
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+
+@require_http_methods(["GET"])
+def autocomplete(request):
+    """?q=stat → countries, cities and destinations whose name (or any word of it) starts with "stat"."""
+    q = request.GET.get('q', '')
     try:
-        # First: try exact match (case-insensitive)
-        country = Country.objects.get(name__iexact=name.strip())
-    except Country.DoesNotExist:
-        try:
-            # Second: try partial match (e.g. "united" → "United States")
-            country = Country.objects.filter(name__icontains=name.strip()).first()
-            if not country:
-                raise Country.DoesNotExist()
-        except Country.DoesNotExist:
-            return JsonResponse({'error': 'Country not found'}, status=404)
+        limit = min(int(request.GET.get('limit', AUTOCOMPLETE_LIMIT)), AUTOCOMPLETE_MAX_LIMIT)
+    except ValueError:
+        return JsonResponse({'error': 'limit must be an integer'}, status=400)
 
     return JsonResponse({
-        'id': country.id,
-        'name': country.name,
-        'slug': country.name.lower().replace(' ', '-'),  # fake slug for frontend if needed
-        # add any other fields you want
-    })
\ No newline at end of file
+        'query': q,
+        'results': get_index().lookup(q, max(limit, 1)),
+    })